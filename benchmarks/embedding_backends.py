@@ -0,0 +1,166 @@
+"""
+Compares the embedding backends on the policy corpus.
+
+Each backend runs in its own subprocess so its peak RSS is measured in
+isolation. The worker embeds every knowledge-base chunk and the policy
+questions from data/intent_examples.jsonl, then reports:
+
+- model load time
+- per-query encode latency (p50/p95, batch size 1, as in the request path)
+- corpus encode throughput
+- peak RSS
+
+Recall@k is the share of the float32 top-k chunks that the backend also
+ranks in its top-k, averaged over the questions.
+
+Usage:
+    python benchmarks/embedding_backends.py --backends torch onnx int8 --k 3
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.config import settings  # noqa: E402
+from src.utils.embeddings import EMBEDDING_BACKENDS, load_embedding_model  # noqa: E402
+from src.utils.ingestion import chunk_document, discover_documents  # noqa: E402
+
+POLICY_LABELS = ("shipping_guidance", "lost_packages")
+
+
+def load_corpus():
+    """Return the knowledge-base chunks, chunked as ingestion does."""
+    chunks = []
+    for _, path in discover_documents(settings.ingestion.source_dir):
+        with open(path, "r", encoding="utf-8") as f:
+            chunks.extend(
+                chunk_document(
+                    f.read(),
+                    settings.ingestion.chunk_size,
+                    settings.ingestion.chunk_overlap,
+                )
+            )
+    return chunks
+
+
+def load_queries():
+    """Return the policy questions of the intent examples."""
+    with open(settings.intent_classifier.examples_path, "r", encoding="utf-8") as f:
+        examples = [json.loads(line) for line in f if line.strip()]
+    return [
+        example["text"] for example in examples if example["label"] in POLICY_LABELS
+    ]
+
+
+def run_worker(backend, onnx_file, output_path):
+    """Embeds the corpus and queries on one backend and saves the results."""
+    start = time.perf_counter()
+    model = load_embedding_model(settings.EMBEDDING_MODEL, backend, onnx_file)
+    load_seconds = time.perf_counter() - start
+
+    corpus, queries = load_corpus(), load_queries()
+    model.encode(queries[:1])  # Warm-up
+
+    start = time.perf_counter()
+    corpus_vectors = model.encode(corpus, batch_size=32, normalize_embeddings=True)
+    corpus_seconds = time.perf_counter() - start
+
+    latencies, query_vectors = [], []
+    for query in queries:
+        start = time.perf_counter()
+        query_vectors.append(model.encode(query, normalize_embeddings=True))
+        latencies.append(time.perf_counter() - start)
+
+    np.savez(output_path, corpus=corpus_vectors, queries=np.stack(query_vectors))
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_mb = max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+
+    print(
+        json.dumps(
+            {
+                "load_seconds": load_seconds,
+                "query_p50_ms": float(np.percentile(latencies, 50) * 1000),
+                "query_p95_ms": float(np.percentile(latencies, 95) * 1000),
+                "corpus_chunks_per_second": len(corpus) / corpus_seconds,
+                "peak_rss_mb": rss_mb,
+            }
+        )
+    )
+
+
+def recall_at_k(baseline, candidate, k):
+    """Average overlap of the top-k chunks of each query against the baseline."""
+    baseline_top = np.argsort(-(baseline["queries"] @ baseline["corpus"].T), axis=1)
+    candidate_top = np.argsort(-(candidate["queries"] @ candidate["corpus"].T), axis=1)
+    overlaps = [
+        len(set(expected[:k]) & set(found[:k])) / k
+        for expected, found in zip(baseline_top, candidate_top)
+    ]
+    return float(np.mean(overlaps))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the embedding backends.")
+    parser.add_argument(
+        "--backends", nargs="+", choices=EMBEDDING_BACKENDS, default=EMBEDDING_BACKENDS
+    )
+    parser.add_argument("--onnx-file", default=settings.embedding.onnx_file)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--worker", choices=EMBEDDING_BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.onnx_file, args.output)
+        return
+
+    # float32 is the reference for recall, so it always runs first
+    backends = ["torch"] + [backend for backend in args.backends if backend != "torch"]
+    results, vectors = {}, {}
+    with tempfile.TemporaryDirectory() as output_dir:
+        for backend in backends:
+            output_path = os.path.join(output_dir, f"{backend}.npz")
+            command = [sys.executable, __file__, "--worker", backend]
+            command += ["--output", output_path]
+            if args.onnx_file:
+                command += ["--onnx-file", args.onnx_file]
+
+            completed = subprocess.run(command, capture_output=True, text=True)
+            if completed.returncode != 0:
+                print(f"{backend}: failed\n{completed.stderr[-2000:]}", file=sys.stderr)
+                continue
+
+            results[backend] = json.loads(completed.stdout.strip().splitlines()[-1])
+            with np.load(output_path) as data:
+                vectors[backend] = {
+                    "corpus": data["corpus"],
+                    "queries": data["queries"],
+                }
+
+    for backend, result in results.items():
+        if "torch" in vectors:
+            result[f"recall@{args.k}"] = recall_at_k(
+                vectors["torch"], vectors[backend], args.k
+            )
+        print(
+            f"{backend:>6}: load {result['load_seconds']:.1f}s, "
+            f"query p50 {result['query_p50_ms']:.1f}ms / p95 {result['query_p95_ms']:.1f}ms, "
+            f"corpus {result['corpus_chunks_per_second']:.1f} chunks/s, "
+            f"peak RSS {result['peak_rss_mb']:.0f}MB, "
+            f"recall@{args.k} {result.get(f'recall@{args.k}', float('nan')):.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Reports the cold import time of the app's entry modules.
+
+Each module is imported in a fresh interpreter with ``-X importtime``, so
+nothing is shared with earlier runs except the OS file cache. The report gives
+the median wall time over the runs and the import time spent in each
+top-level package, which makes heavy imports pulled in at module level easy
+to spot.
+
+Usage:
+    python benchmarks/import_time.py --modules src.core src.utils --top 15
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+DEFAULT_MODULES = ("src.config", "src.utils", "src.core", "src.core.app")
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|\s+(\S+)$")
+
+
+def import_once(module):
+    """
+    Imports a module in a fresh interpreter.
+
+    Returns:
+        tuple: Wall seconds and the ``-X importtime`` rows as
+        (module, self_us, cumulative_us).
+    """
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=ROOT,
+    )
+    elapsed = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{completed.stderr[-2000:]}")
+
+    rows = []
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us)))
+    return elapsed, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold import time.")
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    for module in args.modules:
+        runs = [import_once(module) for _ in range(args.runs)]
+        wall = statistics.median(elapsed for elapsed, _ in runs)
+        # The last run has the warmest file cache, so it is the most stable
+        rows = runs[-1][1]
+        total_us = rows[-1][2] if rows else 0
+
+        print(
+            f"{module}: {wall * 1000:.0f}ms wall (median of {args.runs}), "
+            f"{total_us / 1000:.0f}ms importing, {len(rows)} modules"
+        )
+        # Self time summed per top-level package, e.g. every qdrant_client.*
+        by_package = {}
+        for name, self_us, _ in rows:
+            package = name.split(".")[0]
+            by_package[package] = by_package.get(package, 0) + self_us
+        for package, self_us in sorted(
+            by_package.items(), key=lambda item: item[1], reverse=True
+        )[: args.top]:
+            print(f"  {self_us / 1000:8.1f}ms  {package}")
+
+
+if __name__ == "__main__":
+    main()
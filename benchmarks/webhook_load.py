@@ -0,0 +1,504 @@
+"""
+Offline load test for the WhatsApp webhook.
+
+Starts local stand-ins for the OpenAI chat completions API and the WhatsApp
+Graph API, launches the app with uvicorn pointed at them, and drives
+synthetic WhatsApp webhook deliveries at a fixed rate. Each message has a
+unique sender, so the reply captured by the fake Graph API is matched to the
+webhook call that caused it.
+
+For every intent the report gives:
+
+- messages sent, completed and failed, and the error rate
+- webhook acknowledgement latency
+- end-to-end latency from the webhook POST to the reply reaching the Graph
+  API (p50/p95/p99)
+
+It also gives the overall throughput.
+
+An error is a non-200 acknowledgement, a reply that never arrives within
+--reply-timeout, or an apology reply from the error handlers.
+
+The fake OpenAI server answers structured-output requests with canned
+objects for the request's schema, choosing the intent from keywords in the
+user message, after --openai-latency-ms (+/- --openai-jitter-ms).
+
+Postgres, Qdrant and the embedding model are still the real ones, so start
+them as for local development first (docker compose up -d).
+
+Usage:
+    python benchmarks/webhook_load.py --rate 20 --duration 60 --openai-latency-ms 400
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+
+import httpx
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+INTENTS = ("track_packages", "update_users_data", "shipping_guidance", "lost_packages")
+
+MESSAGE_TEMPLATES = {
+    "track_packages": [
+        "Where is my package PKG{code:06d}?",
+        "Can you track PKG{code:06d} for me?",
+        "Status of PKG{code:06d} and PKG{other:06d} please",
+    ],
+    "update_users_data": [
+        "Please change my address to {number} Main Street",
+        "I moved, update my address to {number} Oak Avenue",
+        "My city is now Springfield, please update it",
+    ],
+    "shipping_guidance": [
+        "How long does it take to send a package with Economy International?",
+        "What does express shipping cost?",
+        "Which shipping options do you offer for heavy packages?",
+    ],
+    "lost_packages": [
+        "My package is lost, what should I do?",
+        "What is your policy for lost parcels?",
+        "A package never arrived, how do I file a claim?",
+    ],
+}
+
+ERROR_REPLIES = ("error occurred", "unable to process")
+
+TRACKING_CODE = re.compile(r"\bPKG\d{6}\b", re.IGNORECASE)
+
+
+def guess_intent(text):
+    """Keyword intent detection used by the fake OpenAI server."""
+    lowered = text.lower()
+    if TRACKING_CODE.search(text) or "track" in lowered:
+        return "track_packages"
+    if any(word in lowered for word in ("address", "city", "moved")):
+        return "update_users_data"
+    if any(word in lowered for word in ("lost", "never arrived", "claim", "missing")):
+        return "lost_packages"
+    return "shipping_guidance"
+
+
+def canned_output(schema_name, text):
+    """Returns a valid structured output for one of the app's response models."""
+    intent = guess_intent(text)
+    codes = [code.upper() for code in TRACKING_CODE.findall(text)] or ["PKG000000"]
+    collection = (
+        "lost_package_policy" if intent == "lost_packages" else "shipping_information"
+    )
+    common = {"confidence_score": 0.95, "description": f"Synthetic {intent} request."}
+
+    if schema_name == "MessageRequestType":
+        return {"request_type": intent, **common}
+    if schema_name == "RoutedMessageRequest":
+        if intent == "track_packages":
+            parameters = {"tracking_codes": codes}
+        elif intent == "update_users_data":
+            parameters = {"field_type": "address", "field_value": "1 Main Street"}
+        else:
+            parameters = {"search_query": text, "collection_name": collection}
+        return {"intent": {"request_type": intent, **parameters}, **common}
+    if schema_name == "TrackingPackageRequest":
+        return {"tracking_codes": codes, **common}
+    if schema_name == "UserProfileUpdateRequest":
+        return {"field_type": "address", "field_value": "1 Main Street", **common}
+    if schema_name == "PolicyCategoryRequest":
+        return {
+            "request_type": (
+                "lost_packages" if intent == "lost_packages" else "shipping_information"
+            ),
+            "confidence_score": 0.95,
+            "answer": "Synthetic policy answer.",
+        }
+    raise ValueError(f"No canned output for schema '{schema_name}'")
+
+
+def create_fake_openai_app(latency_ms, jitter_ms):
+    """Fake of POST /v1/chat/completions for plain, tool and structured calls."""
+    app = FastAPI()
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        await asyncio.sleep(max(random.gauss(latency_ms, jitter_ms), 0) / 1000)
+
+        user_messages = [m for m in body["messages"] if m.get("role") == "user"]
+        text = user_messages[-1]["content"] if user_messages else ""
+        text = text.split("Current conversation:", 1)[-1].strip()
+
+        content, tool_calls, finish_reason = None, None, "stop"
+        response_format = body.get("response_format") or {}
+        already_searched = any(m.get("role") == "tool" for m in body["messages"])
+
+        if response_format.get("type") == "json_schema":
+            schema_name = response_format["json_schema"]["name"]
+            content = json.dumps(canned_output(schema_name, text))
+        elif body.get("tools") and not already_searched:
+            intent = guess_intent(text)
+            arguments = {
+                "user_input": text,
+                "collection_name": (
+                    "lost_package_policy"
+                    if intent == "lost_packages"
+                    else "shipping_information"
+                ),
+                "confidence_score": 0.95,
+            }
+            tool_calls = [
+                {
+                    "id": f"call_{uuid.uuid4().hex[:12]}",
+                    "type": "function",
+                    "function": {
+                        "name": "search_qdrant",
+                        "arguments": json.dumps(arguments),
+                    },
+                }
+            ]
+            finish_reason = "tool_calls"
+        else:
+            content = "Synthetic answer."
+
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {
+                        "role": "assistant",
+                        "content": content,
+                        "tool_calls": tool_calls,
+                        "refusal": None,
+                    },
+                    "finish_reason": finish_reason,
+                    "logprobs": None,
+                }
+            ],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    return app
+
+
+def create_fake_graph_app(pending, failure_rate):
+    """Fake of the Graph API messages endpoint that records each reply."""
+    app = FastAPI()
+
+    @app.post("/{version}/{phone_number_id}/messages")
+    async def send_message(version: str, phone_number_id: str, request: Request):
+        body = await request.json()
+        if random.random() < failure_rate:
+            return Response(content="Injected failure", status_code=500)
+
+        recipient = body["to"]
+        entry = pending.get(recipient)
+        if entry is not None and not entry["replied"].is_set():
+            entry["reply_at"] = time.perf_counter()
+            entry["reply"] = body["text"]["body"]
+            entry["replied"].set()
+
+        return {
+            "messaging_product": "whatsapp",
+            "contacts": [{"input": recipient, "wa_id": recipient}],
+            "messages": [{"id": f"wamid.{uuid.uuid4().hex}"}],
+        }
+
+    return app
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def serve_in_background(app, port):
+    """Runs a uvicorn server on the current event loop until it is stopped."""
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    return server, task
+
+
+def start_app(port, openai_url, graph_url):
+    """Launches the app under test in a subprocess, pointed at the fakes."""
+    env = dict(os.environ)
+    env.update(
+        {
+            "DYNACONF_OPENAI_BASE_URL": openai_url,
+            "DYNACONF_WHATSAPP__GRAPH_URL": graph_url,
+            "OPENAI_API_KEY": env.get("OPENAI_API_KEY") or "load-test",
+            "ACCESS_TOKEN": env.get("ACCESS_TOKEN") or "load-test",
+            "VERSION": env.get("VERSION") or "v21.0",
+            "PHONE_NUMBER_ID": env.get("PHONE_NUMBER_ID") or "0000000000",
+        }
+    )
+    command = [sys.executable, "-m", "uvicorn", "src.core.app:app"]
+    command += ["--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+    return subprocess.Popen(command, cwd=REPO_ROOT, env=env)
+
+
+async def wait_until_ready(client, app_url, timeout):
+    """Polls /ready until the warm-up has finished, so it is not measured."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            response = await client.get(f"{app_url}/ready")
+            if response.status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError(f"App at {app_url} was not ready within {timeout}s")
+
+
+def synthetic_message(intent):
+    template = random.choice(MESSAGE_TEMPLATES[intent])
+    return template.format(
+        code=random.randint(0, 999999),
+        other=random.randint(0, 999999),
+        number=random.randint(1, 999),
+    )
+
+
+def webhook_payload(sender_id, text):
+    return {
+        "object": "whatsapp_business_account",
+        "entry": [
+            {
+                "id": "load-test",
+                "changes": [
+                    {
+                        "field": "messages",
+                        "value": {
+                            "messaging_product": "whatsapp",
+                            "messages": [
+                                {
+                                    "from": sender_id,
+                                    "id": f"wamid.{uuid.uuid4().hex}",
+                                    "timestamp": str(int(time.time())),
+                                    "type": "text",
+                                    "text": {"body": text},
+                                }
+                            ],
+                        },
+                    }
+                ],
+            }
+        ],
+    }
+
+
+async def send_one(client, app_url, intent, pending, reply_timeout):
+    """Posts one message and waits for its reply; returns the measurements."""
+    sender_id = f"{random.randint(10**11, 10**12 - 1)}"
+    entry = {"replied": asyncio.Event(), "reply_at": None, "reply": None}
+    pending[sender_id] = entry
+    result = {"intent": intent, "ok": False}
+
+    start = time.perf_counter()
+    try:
+        response = await client.post(
+            f"{app_url}/webhook",
+            json=webhook_payload(sender_id, synthetic_message(intent)),
+        )
+        result["ack"] = time.perf_counter() - start
+        if response.status_code != 200:
+            result["error"] = f"ack {response.status_code}"
+            return result
+
+        await asyncio.wait_for(entry["replied"].wait(), reply_timeout)
+        result["latency"] = entry["reply_at"] - start
+        if any(marker in entry["reply"].lower() for marker in ERROR_REPLIES):
+            result["error"] = "error reply"
+        else:
+            result["ok"] = True
+    except asyncio.TimeoutError:
+        result["error"] = "no reply"
+    except httpx.HTTPError as error:
+        result["error"] = type(error).__name__
+    finally:
+        pending.pop(sender_id, None)
+    return result
+
+
+async def drive(client, app_url, rate, duration, mix, pending, reply_timeout):
+    """Sends messages open-loop at a fixed rate and collects every result."""
+    intents, weights = zip(*mix.items())
+    tasks = []
+    start = time.perf_counter()
+    for index in range(int(rate * duration)):
+        delay = start + index / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        intent = random.choices(intents, weights)[0]
+        tasks.append(
+            asyncio.create_task(
+                send_one(client, app_url, intent, pending, reply_timeout)
+            )
+        )
+    results = await asyncio.gather(*tasks)
+    return results, time.perf_counter() - start
+
+
+def percentiles_ms(values):
+    if not values:
+        return "      -       -       -"
+    p50, p95, p99 = np.percentile(np.asarray(values) * 1000, [50, 95, 99])
+    return f"{p50:7.0f} {p95:7.0f} {p99:7.0f}"
+
+
+def report(results, elapsed):
+    by_intent = defaultdict(list)
+    for result in results:
+        by_intent[result["intent"]].append(result)
+    by_intent["overall"] = results
+
+    print(
+        f"\n{'intent':<18} {'sent':>5} {'ok':>5} {'err%':>6}"
+        f" {'ack p50':>8} {'p95':>7} {'p99':>7}  {'e2e p50':>8} {'p95':>7} {'p99':>7}"
+    )
+    for intent in [*INTENTS, "overall"]:
+        group = by_intent.get(intent)
+        if not group:
+            continue
+        ok = [result for result in group if result["ok"]]
+        error_rate = 100 * (len(group) - len(ok)) / len(group)
+        acks = [result["ack"] for result in group if "ack" in result]
+        print(
+            f"{intent:<18} {len(group):>5} {len(ok):>5} {error_rate:>5.1f}%"
+            f" {percentiles_ms(acks)}  {percentiles_ms([r['latency'] for r in ok])}"
+        )
+
+    errors = defaultdict(int)
+    for result in results:
+        if not result["ok"]:
+            errors[result["error"]] += 1
+    completed = sum(result["ok"] for result in results)
+    print(f"\nThroughput: {completed / elapsed:.1f} replies/s over {elapsed:.1f}s")
+    if errors:
+        print("Errors: " + ", ".join(f"{k} x{v}" for k, v in errors.items()))
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(","):
+        intent, weight = part.split("=")
+        if intent not in INTENTS:
+            raise argparse.ArgumentTypeError(f"Unknown intent '{intent}'")
+        mix[intent] = float(weight)
+    return mix
+
+
+async def main_async(args):
+    pending = {}
+    openai_port = args.openai_port or free_port()
+    graph_port = args.graph_port or free_port()
+    openai_server, openai_task = await serve_in_background(
+        create_fake_openai_app(args.openai_latency_ms, args.openai_jitter_ms),
+        openai_port,
+    )
+    graph_server, graph_task = await serve_in_background(
+        create_fake_graph_app(pending, args.graph_failure_rate), graph_port
+    )
+
+    app_process = None
+    app_url = args.app_url
+    if app_url is None:
+        app_port = free_port()
+        app_url = f"http://127.0.0.1:{app_port}"
+        app_process = start_app(
+            app_port,
+            openai_url=f"http://127.0.0.1:{openai_port}/v1",
+            graph_url=f"http://127.0.0.1:{graph_port}",
+        )
+
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=100)
+    try:
+        async with httpx.AsyncClient(limits=limits, timeout=30.0) as client:
+            await wait_until_ready(client, app_url, args.startup_timeout)
+
+            if args.warmup:
+                print(f"Warming up with {args.warmup} messages...")
+                await drive(
+                    client,
+                    app_url,
+                    args.warmup,
+                    1,
+                    args.mix,
+                    pending,
+                    args.reply_timeout,
+                )
+
+            print(f"Sending {args.rate}/s for {args.duration}s...")
+            results, elapsed = await drive(
+                client,
+                app_url,
+                args.rate,
+                args.duration,
+                args.mix,
+                pending,
+                args.reply_timeout,
+            )
+            report(results, elapsed)
+    finally:
+        if app_process is not None:
+            app_process.terminate()
+            app_process.wait(timeout=30)
+        openai_server.should_exit = graph_server.should_exit = True
+        await asyncio.gather(openai_task, graph_task)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the WhatsApp webhook.")
+    parser.add_argument("--rate", type=float, default=10.0, help="Messages per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds")
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default={intent: 1.0 for intent in INTENTS},
+        help="Intent weights, e.g. track_packages=4,lost_packages=1",
+    )
+    parser.add_argument("--openai-latency-ms", type=float, default=300.0)
+    parser.add_argument("--openai-jitter-ms", type=float, default=100.0)
+    parser.add_argument(
+        "--graph-failure-rate",
+        type=float,
+        default=0.0,
+        help="Share of sends the fake Graph API rejects with a 500",
+    )
+    parser.add_argument(
+        "--openai-port", type=int, default=0, help="0 picks a free port"
+    )
+    parser.add_argument("--graph-port", type=int, default=0, help="0 picks a free port")
+    parser.add_argument("--reply-timeout", type=float, default=60.0)
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured messages")
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    parser.add_argument(
+        "--app-url",
+        help="Target an app that is already running instead of launching one; "
+        "point it at the fakes with --openai-port/--graph-port",
+    )
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
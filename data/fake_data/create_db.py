@@ -3,7 +3,7 @@ import uuid
 from datetime import datetime
 
 from faker import Faker
-from sqlalchemy import DECIMAL, TIMESTAMP, Column, String, Text, create_engine
+from sqlalchemy import DECIMAL, TIMESTAMP, Column, Index, String, Text, create_engine
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import declarative_base, sessionmaker
 
@@ -129,11 +129,20 @@ print("Inserted 50 fake user records successfully!")
 # Define the UserLLMInteraction model for logging interactions with an LLM
 class UserLLMInteraction(Base):
     __tablename__ = "user_llm_interactions"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        # Looks up one sender's most recent interactions
+        Index(
+            "ix_user_llm_interactions_sender_time",
+            "sender_id",
+            "interaction_time",
+        ),
+        {"extend_existing": True},
+    )
 
     id = Column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )  # Unique interaction ID
+    sender_id = Column(String(32), nullable=True)  # WhatsApp ID of the sender
     question = Column(Text, nullable=False)  # User's question to the LLM
     response = Column(Text, nullable=False)  # LLM's response to the question
     interaction_time = Column(
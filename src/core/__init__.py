@@ -1,13 +1,27 @@
 from .lost_item_and_shipping_info import retrieve_policy_and_shipping_info
-from .message_classification import route_message_request
+from .message_classification import (
+    route_and_extract_message_request,
+    route_message_request,
+)
 from .process_tracking import process_tracking_package_request
 from .update_user_profile import update_user_profile
 from .llm_router import llm_router
+from .request_context import RequestContext
+from .fast_path import get_fast_path_stats
+from .intent_classifier import IntentClassifier, get_local_routing_stats
+from .warmup import Warmup, get_warmup
 
 __all__ = [
     "process_tracking_package_request",
     "retrieve_policy_and_shipping_info",
     "route_message_request",
+    "route_and_extract_message_request",
     "update_user_profile",
     "llm_router",
+    "RequestContext",
+    "get_fast_path_stats",
+    "IntentClassifier",
+    "get_local_routing_stats",
+    "Warmup",
+    "get_warmup",
 ]
@@ -1,6 +1,96 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from src.core import get_fast_path_stats, get_local_routing_stats, get_warmup
+from src.core.whatsapp_webhook import get_message_queue, whatsapp_router
+from src.utils import (
+    close_qdrant_clients,
+    get_completion_cache,
+    get_conversation_memory,
+    get_embedding_service,
+    get_interaction_logger,
+    get_pool_stats,
+    get_qdrant_stats,
+    get_semantic_cache,
+    get_tracking_cache,
+    get_whatsapp_sender,
+    render_histograms,
+    render_stats_gauges,
+    setup_logging,
+    start_tracking_listener,
+    stop_tracking_listener,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Owns the lifetime of the shared clients, the message workers, the interaction logger, the tracking change listener and the warm-up."""
+    await asyncio.to_thread(start_tracking_listener)
+
+    interaction_logger = get_interaction_logger()
+    await interaction_logger.start()
+    whatsapp_sender = get_whatsapp_sender()
+    await whatsapp_sender.start()
+    message_queue = get_message_queue()
+    await message_queue.start()
+    warmup = get_warmup()
+    await warmup.start()
+    yield
+    await warmup.stop()
+    await message_queue.stop()
+    await whatsapp_sender.stop()
+    # Flush buffered interactions after the workers have finished
+    await interaction_logger.stop()
+    await close_qdrant_clients()
+    await asyncio.to_thread(stop_tracking_listener)
 
-from src.core.whatsapp_webhook import whatsapp_router
 
-app = FastAPI()
+setup_logging()
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(whatsapp_router)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """
+    Exposes the stage latency histograms and the components' own statistics in
+    the Prometheus text format.
+    """
+    components = {
+        "database_pool": get_pool_stats(),
+        "vector_search": get_qdrant_stats(),
+        "embedding": get_embedding_service().stats(),
+        "message_queue": get_message_queue().stats(),
+        "interaction_logger": get_interaction_logger().stats(),
+        "conversation_memory": get_conversation_memory().stats(),
+        "semantic_cache": get_semantic_cache().stats(),
+        "llm_cache": get_completion_cache().stats(),
+        "tracking_cache": get_tracking_cache().stats(),
+        "whatsapp_sender": get_whatsapp_sender().stats(),
+        "fast_path": get_fast_path_stats(),
+        "local_routing": get_local_routing_stats(),
+        "warmup": {"ready": get_warmup().ready},
+    }
+    gauges = render_stats_gauges(
+        "component_stat", "Statistics reported by the app's components.", components
+    )
+    return PlainTextResponse(
+        render_histograms() + "\n" + "\n".join(gauges) + "\n",
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+@app.get("/ready")
+async def ready() -> JSONResponse:
+    """
+    Readiness probe: 503 until the warm-up has loaded the model and opened the
+    connections, so traffic is only routed to warm instances.
+    """
+    warmup = get_warmup()
+    return JSONResponse(
+        content=warmup.stats(), status_code=200 if warmup.ready else 503
+    )
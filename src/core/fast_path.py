@@ -0,0 +1,71 @@
+import logging
+import re
+from typing import Dict, List, Optional
+
+from src.core.process_tracking import (
+    format_tracking_responses,
+    limit_tracking_codes,
+)
+from src.core.request_context import RequestContext
+from src.utils import get_tracking_cache
+
+# Tracking codes are "PKG" followed by six digits (see data/fake_data/create_db.py)
+TRACKING_CODE_PATTERN = re.compile(r"\bPKG\d{6}\b", re.IGNORECASE)
+
+_fast_path_counters = {"hits": 0, "misses": 0}
+
+
+def find_tracking_codes(message: str) -> List[str]:
+    """
+    Finds every tracking code in a message.
+
+    Args:
+        message (str): The message sent by the user.
+
+    Returns:
+        list[str]: The distinct upper-cased tracking codes, in message order.
+    """
+    return list(
+        dict.fromkeys(match.upper() for match in TRACKING_CODE_PATTERN.findall(message))
+    )
+
+
+async def tracking_fast_path(context: RequestContext) -> Optional[str]:
+    """
+    Answers messages that carry tracking codes straight from the tracking
+    cache or the database, skipping both the routing and the extraction LLM
+    calls. Several codes are resolved with one bulk query.
+
+    Args:
+        context (RequestContext): The current message; the conversation
+            history is not used and need not be loaded.
+
+    Returns:
+        str or None: The tracking reply, or None to fall back to the LLM router.
+    """
+    tracking_codes, omitted = limit_tracking_codes(
+        find_tracking_codes(context.user_message)
+    )
+    if not tracking_codes:
+        _fast_path_counters["misses"] += 1
+        return None
+
+    _fast_path_counters["hits"] += 1
+    logging.info(f"Tracking fast path matched codes: {tracking_codes}")
+
+    output_queries = await get_tracking_cache().aget_many(tracking_codes)
+    packages = "package" if len(tracking_codes) == 1 else "packages"
+    await context.remember(
+        f"Tracking request for {packages} {', '.join(tracking_codes)}."
+    )
+
+    return format_tracking_responses(tracking_codes, output_queries, omitted)
+
+
+def get_fast_path_stats() -> Dict[str, float]:
+    """Return how many messages the tracking fast path answered or passed on."""
+    total = _fast_path_counters["hits"] + _fast_path_counters["misses"]
+    return {
+        **_fast_path_counters,
+        "hit_rate": _fast_path_counters["hits"] / total if total else 0.0,
+    }
@@ -0,0 +1,317 @@
+import argparse
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.config import settings
+from src.core.request_context import RequestContext
+from src.utils import get_embedding_service, setup_logging
+
+INTENT_LABELS = (
+    "track_packages",
+    "update_users_data",
+    "shipping_guidance",
+    "lost_packages",
+)
+
+_local_routing_counters = {"decided": 0, "deferred": 0}
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class IntentClassifier:
+    """
+    Nearest-centroid intent classifier over sentence embeddings.
+
+    Each intent is represented by the normalized mean embedding of its labelled
+    examples. A prediction is only trusted when the best cosine similarity
+    reaches ``min_similarity`` and beats the runner-up by ``min_margin``.
+    """
+
+    def __init__(
+        self,
+        centroids: np.ndarray,
+        labels: Sequence[str],
+        min_similarity: float = 0.75,
+        min_margin: float = 0.05,
+    ):
+        self.centroids = _normalize_rows(np.asarray(centroids, dtype=np.float32))
+        self.labels = list(labels)
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+
+    @classmethod
+    def train(
+        cls, embeddings: np.ndarray, labels: Sequence[str], **kwargs
+    ) -> "IntentClassifier":
+        """
+        Builds the centroids from labelled example embeddings.
+
+        Args:
+            embeddings (np.ndarray): One embedding per example.
+            labels (Sequence[str]): The intent label of each example.
+
+        Returns:
+            IntentClassifier: The trained classifier.
+        """
+        embeddings = _normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        labels = np.asarray(labels)
+        classes = [label for label in INTENT_LABELS if label in set(labels)]
+        centroids = np.stack(
+            [embeddings[labels == label].mean(axis=0) for label in classes]
+        )
+        return cls(centroids, classes, **kwargs)
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "IntentClassifier":
+        """Loads centroids saved with ``save``."""
+        with np.load(path) as data:
+            return cls(data["centroids"], data["labels"].tolist(), **kwargs)
+
+    def save(self, path: str):
+        """Saves the centroid matrix and its labels as an ``.npz`` file."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez(path, centroids=self.centroids, labels=np.asarray(self.labels))
+
+    def predict(self, embedding: Sequence[float]) -> Tuple[str, float, float]:
+        """
+        Scores an embedding against every intent.
+
+        Args:
+            embedding (Sequence[float]): Embedding of the user message.
+
+        Returns:
+            tuple: (best label, its cosine similarity, margin over the runner-up).
+        """
+        vector = np.asarray(embedding, dtype=np.float32)
+        vector = vector / (np.linalg.norm(vector) or 1.0)
+        scores = self.centroids @ vector
+        order = np.argsort(scores)[::-1]
+        best = float(scores[order[0]])
+        runner_up = float(scores[order[1]]) if len(order) > 1 else -1.0
+        return self.labels[order[0]], best, best - runner_up
+
+    def classify(self, embedding: Sequence[float]) -> Optional[str]:
+        """
+        Returns the intent when the prediction is confident enough.
+
+        Args:
+            embedding (Sequence[float]): Embedding of the user message.
+
+        Returns:
+            str or None: The intent label, or None to defer to the LLM router.
+        """
+        label, similarity, margin = self.predict(embedding)
+        if similarity >= self.min_similarity and margin >= self.min_margin:
+            return label
+        return None
+
+
+_intent_classifier = None
+_intent_classifier_loaded = False
+
+
+def get_intent_classifier() -> Optional[IntentClassifier]:
+    """
+    Return the classifier trained with this module's CLI, loading it on first use.
+
+    Returns:
+        IntentClassifier or None: None when local routing is disabled, the
+        combined routing mode is used, or no trained centroids exist yet.
+    """
+    global _intent_classifier, _intent_classifier_loaded
+
+    if not _intent_classifier_loaded:
+        _intent_classifier_loaded = True
+        classifier_config = settings.intent_classifier
+
+        if not classifier_config.enabled:
+            return None
+        if settings.routing.mode != "two_step":
+            # The combined router classifies and extracts in one call, so a local
+            # decision would only move the extraction call into the handler
+            logging.info("Local intent routing only runs in the two_step routing mode")
+            return None
+        if not os.path.exists(classifier_config.model_path):
+            logging.warning(
+                f"No intent centroids at {classifier_config.model_path}; "
+                "every message will be routed by the LLM"
+            )
+            return None
+
+        _intent_classifier = IntentClassifier.load(
+            classifier_config.model_path,
+            min_similarity=classifier_config.min_similarity,
+            min_margin=classifier_config.min_margin,
+        )
+        logging.info(
+            f"Loaded intent classifier with labels {_intent_classifier.labels}"
+        )
+    return _intent_classifier
+
+
+async def classify_intent_locally(context: RequestContext) -> Optional[str]:
+    """
+    Decides the intent with the local classifier when it is confident, so the
+    LLM router is not called.
+
+    Args:
+        context (RequestContext): The current message and conversation history.
+
+    Returns:
+        str or None: The intent, or None to defer to the LLM router.
+    """
+    classifier = get_intent_classifier()
+    if classifier is None:
+        return None
+
+    embedding = await get_embedding_service().aencode(context.user_message)
+    intent = classifier.classify(embedding)
+
+    if intent is None:
+        _local_routing_counters["deferred"] += 1
+    else:
+        _local_routing_counters["decided"] += 1
+        logging.info(f"Request routed locally as: {intent}")
+    return intent
+
+
+def get_local_routing_stats() -> Dict[str, float]:
+    """
+    Return how many messages the local classifier decided or deferred.
+
+    Local routing only runs in the two_step mode, where each decided message
+    skips exactly one LLM call, the classification.
+    """
+    total = _local_routing_counters["decided"] + _local_routing_counters["deferred"]
+    return {
+        **_local_routing_counters,
+        "decided_rate": _local_routing_counters["decided"] / total if total else 0.0,
+        "llm_calls_saved": _local_routing_counters["decided"],
+    }
+
+
+def load_examples(path: str) -> Tuple[List[str], List[str]]:
+    """
+    Reads labelled examples from a JSON Lines file of {"text", "label"} objects.
+
+    Returns:
+        tuple: The example texts and their labels.
+    """
+    texts, labels = [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            example = json.loads(line)
+            if example["label"] not in INTENT_LABELS:
+                raise ValueError(f"Unknown intent label: {example['label']}")
+            texts.append(example["text"])
+            labels.append(example["label"])
+    return texts, labels
+
+
+def evaluate(
+    embeddings: np.ndarray,
+    labels: Sequence[str],
+    min_similarity: float,
+    min_margin: float,
+) -> Dict[str, Any]:
+    """
+    Leave-one-out evaluation: each example is classified by centroids built
+    from all the other examples.
+
+    Args:
+        embeddings (np.ndarray): One embedding per example.
+        labels (Sequence[str]): The intent label of each example.
+        min_similarity (float): Similarity threshold under test.
+        min_margin (float): Margin threshold under test.
+
+    Returns:
+        dict: Overall accuracy, coverage (share decided without the LLM),
+        accuracy on the covered share, and per-label figures.
+    """
+    embeddings = _normalize_rows(np.asarray(embeddings, dtype=np.float32))
+    labels = np.asarray(labels)
+    per_label = {
+        label: {"total": 0, "correct": 0, "decided": 0} for label in INTENT_LABELS
+    }
+    correct = decided = decided_correct = 0
+
+    for index in range(len(labels)):
+        mask = np.arange(len(labels)) != index
+        classifier = IntentClassifier.train(
+            embeddings[mask],
+            labels[mask],
+            min_similarity=min_similarity,
+            min_margin=min_margin,
+        )
+        predicted, similarity, margin = classifier.predict(embeddings[index])
+        is_correct = predicted == labels[index]
+        is_decided = similarity >= min_similarity and margin >= min_margin
+
+        counts = per_label[labels[index]]
+        counts["total"] += 1
+        counts["correct"] += int(is_correct)
+        counts["decided"] += int(is_decided)
+        correct += int(is_correct)
+        decided += int(is_decided)
+        decided_correct += int(is_decided and is_correct)
+
+    total = len(labels)
+    return {
+        "examples": total,
+        "accuracy": correct / total if total else 0.0,
+        "coverage": decided / total if total else 0.0,
+        "accuracy_when_decided": decided_correct / decided if decided else 0.0,
+        "per_label": {
+            label: {
+                **counts,
+                "accuracy": (
+                    counts["correct"] / counts["total"] if counts["total"] else 0.0
+                ),
+            }
+            for label, counts in per_label.items()
+            if counts["total"]
+        },
+    }
+
+
+def main():
+    """CLI to train the centroids and report their offline accuracy."""
+    classifier_config = settings.intent_classifier
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("command", choices=["train", "evaluate"])
+    parser.add_argument("--examples", default=classifier_config.examples_path)
+    parser.add_argument("--output", default=classifier_config.model_path)
+    parser.add_argument(
+        "--min-similarity", type=float, default=classifier_config.min_similarity
+    )
+    parser.add_argument(
+        "--min-margin", type=float, default=classifier_config.min_margin
+    )
+    args = parser.parse_args()
+    setup_logging()
+
+    texts, labels = load_examples(args.examples)
+    embeddings = np.asarray(get_embedding_service().encode(texts), dtype=np.float32)
+
+    if args.command == "train":
+        classifier = IntentClassifier.train(embeddings, labels)
+        classifier.save(args.output)
+        print(f"Saved centroids for {classifier.labels} to {args.output}")
+    else:
+        report = evaluate(embeddings, labels, args.min_similarity, args.min_margin)
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,61 +1,158 @@
 # Main handler
 import logging
+from typing import Optional, Union
 
+from pydantic import BaseModel
+
+from src.config import settings
 from src.core import (
     process_tracking_package_request,
     retrieve_policy_and_shipping_info,
     route_message_request,
     update_user_profile,
 )
+from src.core.fast_path import tracking_fast_path
+from src.core.intent_classifier import classify_intent_locally
+from src.core.message_classification import route_and_extract_message_request
+from src.core.request_context import RequestContext
+from src.schemas import (
+    RoutedMessageRequest,
+    SearchQdrantRequest,
+    TrackingPackageRequest,
+    TrackPackagesIntent,
+    UpdateUserDataIntent,
+    UserProfileUpdateRequest,
+)
+from src.utils import request_stage_seconds
+
+ERROR_REPLY = "An error occurred while processing your request. Please try again later."
+
+
+def extracted_parameters(routed: RoutedMessageRequest) -> BaseModel:
+    """
+    Converts the combined router's output into the request model the selected
+    handler would otherwise have extracted with its own LLM call.
+
+    Args:
+        routed (RoutedMessageRequest): The combined routing result.
 
+    Returns:
+        TrackingPackageRequest, UserProfileUpdateRequest or SearchQdrantRequest.
+    """
+    intent = routed.intent
+    if isinstance(intent, TrackPackagesIntent):
+        return TrackingPackageRequest(
+            tracking_codes=intent.tracking_codes,
+            confidence_score=routed.confidence_score,
+            description=routed.description,
+        )
+    if isinstance(intent, UpdateUserDataIntent):
+        return UserProfileUpdateRequest(
+            field_type=intent.field_type,
+            field_value=intent.field_value,
+            confidence_score=routed.confidence_score,
+            description=routed.description,
+        )
+    return SearchQdrantRequest(
+        user_input=intent.search_query,
+        collection_name=intent.collection_name,
+        confidence_score=routed.confidence_score,
+    )
 
-def llm_router(user_message):
+
+async def llm_router(user_message, sender_id):
     """
     Handles user requests by classifying the intent and routing it
     to the appropriate function.
 
     Args:
         user_message (str): The message sent by the user.
+        sender_id (str): WhatsApp ID of the user, used to scope conversation memory.
 
     Returns:
         str: Response from the appropriate function or an error message.
     """
-    try:
-        # Step 1: Classify the user's intent
-        classify_message = route_message_request(user_message)
-        intent = classify_message.request_type
+    with request_stage_seconds.time(stage="request", intent="unknown") as labels:
+        try:
+            # Step 0: Answer messages with a tracking code without calling the
+            # LLM; only the message is needed, so no history is loaded yet
+            fast_reply = await tracking_fast_path(
+                RequestContext(user_message=user_message, sender_id=sender_id)
+            )
+            if fast_reply is not None:
+                labels["intent"] = "track_packages"
+                return fast_reply
 
-        # Step 2: Route the request based on the classified intent
-        if intent == "track_packages":
-            # Extract tracking code from message
-            tracking_code = process_tracking_package_request(user_message)
+            # Load the sender's conversation history once for every LLM stage
+            context = await RequestContext.load(user_message, sender_id)
 
-            return tracking_code
+            # Step 1: Classify the user's intent, locally when the embedding
+            # classifier is confident and otherwise with the LLM, which also
+            # extracts the parameters when the combined routing mode is enabled
+            extracted: Optional[
+                Union[
+                    TrackingPackageRequest,
+                    UserProfileUpdateRequest,
+                    SearchQdrantRequest,
+                ]
+            ] = None
+            with request_stage_seconds.time(
+                stage="intent_classification", intent="unknown"
+            ) as classification_labels:
+                intent = await classify_intent_locally(context)
+                if intent is None and settings.routing.mode == "combined":
+                    routed = await route_and_extract_message_request(context)
+                    intent = routed.intent.request_type
+                    extracted = extracted_parameters(routed)
+                elif intent is None:
+                    classify_message = await route_message_request(context)
+                    intent = classify_message.request_type
+                classification_labels["intent"] = intent
+            labels["intent"] = intent
 
-        elif intent == "update_users_data":
-            update_data = update_user_profile(user_message)
+            # Step 2: Route the request based on the classified intent
+            with request_stage_seconds.time(stage="handler", intent=intent):
+                if intent == "track_packages":
+                    # Extract tracking code from message
+                    tracking_code = await process_tracking_package_request(
+                        context, extracted=extracted
+                    )
 
-            return update_data
+                    return tracking_code
 
-        elif intent in ["shipping_guidance", "lost_packages"]:
+                elif intent == "update_users_data":
+                    update_data = await update_user_profile(
+                        context, extracted=extracted
+                    )
+                    if update_data is None:
+                        labels["outcome"] = "error"
+                        return ERROR_REPLY
 
-            vdb_response = retrieve_policy_and_shipping_info(user_message)
+                    return (
+                        f"Your {update_data.field_type} has been updated to "
+                        f"{update_data.field_value}."
+                    )
 
-            return vdb_response.choices[0].message.parsed.answer
-        else:
-            return "I'm unable to process that request. Can you provide more details?"
+                elif intent in ["shipping_guidance", "lost_packages"]:
 
-    except Exception as e:
-        # Log the error and return a user-friendly response
-        logging.error(f"Error handling request: {e}")
-        return (
-            "An error occurred while processing your request. Please try again later."
-        )
+                    vdb_response = await retrieve_policy_and_shipping_info(
+                        context, search_request=extracted
+                    )
+
+                    return vdb_response.answer
+                else:
+                    return "I'm unable to process that request. Can you provide more details?"
+
+        except Exception as e:
+            # Log the error and return a user-friendly response
+            labels["outcome"] = "error"
+            logging.error(f"Error handling request: {e}")
+            return ERROR_REPLY
 
 
 # question1 = "What should I do if my package is lost?"
-# print(llm_router(question1))
+# print(asyncio.run(llm_router(question1, sender_id="test")))
 # question2 = "How long does it take to send a package to Economy International? And the price?"
-# print(llm_router(question2))
+# print(asyncio.run(llm_router(question2, sender_id="test")))
 # question3 = "I want to track the location of my package"
-# print(llm_router(question3))
+# print(asyncio.run(llm_router(question3, sender_id="test")))
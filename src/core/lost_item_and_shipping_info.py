@@ -1,93 +1,185 @@
+import asyncio
 import json
 import logging
-from typing import Any
+from typing import Any, Dict, List, Optional, Tuple
 
 from langfuse.decorators import observe
-from sentence_transformers import SentenceTransformer
 
 from src.config import settings
+from src.core.request_context import RequestContext
 from src.schemas import PolicyCategoryRequest, SearchQdrantRequest
 from src.utils import (
-    get_interactions_from_db,
-    get_langfuse_client,
-    get_openai_client,
-    save_interaction_to_db,
-    search_qdrant,
+    asearch_qdrant,
+    asearch_qdrant_collections,
+    get_async_openai_client,
+    get_completion_cache,
+    get_embedding_service,
+    get_semantic_cache,
+    has_policy_context,
+    request_stage_seconds,
 )
 
-# Access the clients
-openai_client = get_openai_client()
-langfuse_client = get_langfuse_client()
 
+_policy_search_tools = None
 
-# Define the function
-@observe()
-def retrieve_policy_and_shipping_info(
-    user_input: str, client: Any = openai_client, model_name: str = settings.MODEL_NAME
-) -> PolicyCategoryRequest:
+
+def get_policy_search_tools() -> List[Dict[str, Any]]:
     """
-    Retrieves a company policy answer based on the user's question.
+    Return the tool definitions offered to the LLM for policy retrieval.
+
+    The JSON schema is generated from ``SearchQdrantRequest`` once and reused by
+    every request.
+    """
+    global _policy_search_tools
+
+    if _policy_search_tools is None:
+        _policy_search_tools = [
+            {
+                "type": "function",
+                "function": {
+                    "name": "search_qdrant",
+                    "description": "Retrieve company policy from the correct Qdrant collection based on the user's query.",
+                    "parameters": SearchQdrantRequest.model_json_schema(),
+                    "strict": True,  # Enforce strict validation
+                },
+            }
+        ]
+    return _policy_search_tools
+
+
+async def run_search_tool_calls(
+    tool_calls: List[Any],
+) -> Tuple[List[Dict[str, str]], bool]:
+    """
+    Executes the ``search_qdrant`` tool calls of one completion together.
+
+    Every query is embedded in a single batched forward pass and the searches
+    run concurrently.
 
     Args:
-        user_input: User's input question about company policy.
-        client: OpenAI API client.
-        model: LLM model to use.
+        tool_calls (list): Tool calls from the completion message.
 
     Returns:
-        str: Final formatted policy answer.
+        tuple: One tool message per call, in the same order as ``tool_calls``,
+        and whether any search retrieved policy text.
     """
+    tool_args = []
+    for tool_call in tool_calls:
+        args = json.loads(tool_call.function.arguments)
+        args.pop("confidence_score", None)
+        tool_args.append(args)
+
+    query_vectors = await get_embedding_service().aencode(
+        [args["user_input"] for args in tool_args]
+    )
+    responses = await asyncio.gather(
+        *(
+            asearch_qdrant(**args, query_vector=query_vector)
+            for args, query_vector in zip(tool_args, query_vectors)
+        )
+    )
 
-    # Define tools for function calling
-    tools = [
+    tool_messages = [
         {
-            "type": "function",
-            "function": {
-                "name": "search_qdrant",
-                "description": "Retrieve company policy from the correct Qdrant collection based on the user's query.",
-                "parameters": SearchQdrantRequest.model_json_schema(),
-                "strict": True,  # Enforce strict validation
-            },
+            "role": "tool",
+            "tool_call_id": tool_call.id,
+            "content": json.dumps(response),
         }
+        for tool_call, response in zip(tool_calls, responses)
     ]
+    return tool_messages, any(has_policy_context(response) for response in responses)
 
-    # Retrieve last 5 interactions from the database
-    interactions = get_interactions_from_db()
 
-    # Initial Messages
-    messages = [
-        {
-            "role": "system",
-            "content": "You are a helpful assistant that strictly follows company policies.",
-        },
-        {
-            "role": "system",
-            "content": "These are the last five messages of previous conversation but You do not need to use these pieces of information if not relevant:\n"
-            + "\n".join(
-                [
-                    f"User: {interaction[0]}\nAssistant: {interaction[1]}"
-                    for interaction in interactions
-                ]
-            )
-            + "\n\n(End of previous conversation)",
-        },
-        {"role": "user", "content": f"Current conversation: {user_input}"},
-    ]
+# Define the function
+@observe()
+async def retrieve_policy_and_shipping_info(
+    context: RequestContext,
+    search_request: Optional[SearchQdrantRequest] = None,
+    client: Any = None,
+    model_name: str = settings.MODEL_NAME,
+) -> PolicyCategoryRequest:
+    """
+    Retrieves a company policy answer based on the user's question.
 
-    # Call LLM to determine the right tool call
-    logging.info("Route message based on the vector store db information")
-    completion = client.chat.completions.create(
-        model=model_name, messages=messages, tools=tools
-    )
-    completion_tools = completion.choices[0].message.tool_calls
+    Args:
+        context: Request context with the user's policy question and history.
+        search_request: Search query and collection already chosen by the combined
+            router. When given, the tool-selection LLM call is skipped, and both
+            collections are searched if the router's confidence is below
+            ``policy_retrieval.ambiguous_confidence``.
+        client: OpenAI API client. Defaults to the shared async client.
+        model: LLM model to use.
 
-    if completion_tools:
-        embedding_model = SentenceTransformer(settings.EMBEDDING_MODEL)
-        # Process tool calls
-        for tool_call in completion.choices[0].message.tool_calls:
-            tool_args = json.loads(tool_call.function.arguments)
-            tool_args.pop("confidence_score", None)
+    Returns:
+        PolicyCategoryRequest: The policy category and final formatted answer.
+    """
+
+    # Initial Messages
+    messages = context.build_messages(
+        "You are a helpful assistant that strictly follows company policies."
+    )
 
-            # Create a new ChatCompletionMessage and convert it to a dictionary before appending
+    # Reuse the answer to a near-identical question when we have one
+    semantic_cache = get_semantic_cache()
+    query_vector = await get_embedding_service().aencode(context.user_message)
+    await semantic_cache.check_version()
+    cached_answer = semantic_cache.lookup(query_vector)
+    if cached_answer is not None:
+        await context.remember(cached_answer.answer)
+        return cached_answer
+
+    client = client or get_async_openai_client()
+    # Only answers grounded in retrieved policy text are worth caching
+    grounded = False
+    if search_request is not None:
+        # The combined router already chose the collection and the search
+        # query; when it is unsure of the collection, search both
+        if (
+            search_request.confidence_score
+            < settings.policy_retrieval.ambiguous_confidence
+        ):
+            responses = await asearch_qdrant_collections(search_request.user_input)
+        else:
+            responses = {
+                search_request.collection_name: await asearch_qdrant(
+                    user_input=search_request.user_input,
+                    collection_name=search_request.collection_name,
+                )
+            }
+        grounded = any(has_policy_context(response) for response in responses.values())
+        for collection_name, response in responses.items():
+            messages.append(
+                {
+                    "role": "system",
+                    "content": f"Company policy retrieved from '{collection_name}': "
+                    + json.dumps(response),
+                }
+            )
+        messages.append(
+            {
+                "role": "system",
+                "content": (
+                    "Based on the extracted company policy, generate a **clear and concise answer** "
+                    "to the user's question."
+                ),
+            }
+        )
+    else:
+        # Let the LLM choose the collections to search, feeding the results
+        # back for up to max_tool_iterations rounds of tool calls
+        logging.info("Route message based on the vector store db information")
+        for _ in range(settings.policy_retrieval.max_tool_iterations):
+            with request_stage_seconds.time(
+                stage="parameter_extraction", intent="policy"
+            ):
+                completion = await client.chat.completions.create(
+                    model=model_name, messages=messages, tools=get_policy_search_tools()
+                )
+            completion_tools = completion.choices[0].message.tool_calls
+            if not completion_tools:
+                break
+
+            # One assistant message carries every tool call of this completion
             messages.append(
                 {
                     "content": None,
@@ -96,42 +188,38 @@ def retrieve_policy_and_shipping_info(
                     "audio": None,
                     "function_call": None,
                     "tool_calls": [
-                        tool_call.model_dump()
-                    ],  # Convert tool_call to a dictionary
+                        tool_call.model_dump() for tool_call in completion_tools
+                    ],
                     "annotations": [],
                 }
             )
-
-            # Retrieve policy from Qdrant
-            response = search_qdrant(**tool_args, embedding_model=embedding_model)
-
-            # Append retrieved policy to messages
-            messages.append(
-                {
-                    "role": "tool",
-                    "tool_call_id": tool_call.id,
-                    "content": json.dumps(response),
-                }
-            )
-
-            # Ask LLM to generate a refined response
-            messages.append(
-                {
-                    "role": "system",
-                    "content": (
-                        "Based on the extracted company policy, generate a **clear and concise answer** "
-                        "to the user's question."
-                    ),
-                }
-            )
+            tool_messages, found = await run_search_tool_calls(completion_tools)
+            messages.extend(tool_messages)
+            grounded = grounded or found
+
+        # Ask LLM to generate a refined response
+        messages.append(
+            {
+                "role": "system",
+                "content": (
+                    "Based on the extracted company policy, generate a **clear and concise answer** "
+                    "to the user's question."
+                ),
+            }
+        )
 
     # Generate final completion with refined answer
-    final_completion = client.beta.chat.completions.parse(
-        model=model_name, messages=messages, response_format=PolicyCategoryRequest
-    )
-
-    save_interaction_to_db(
-        question=user_input, response=final_completion.choices[0].message.parsed.answer
-    )
-
-    return final_completion
+    with request_stage_seconds.time(stage="answer_generation", intent="policy"):
+        result = await get_completion_cache().parse(
+            client,
+            stage="policy",
+            model=model_name,
+            messages=messages,
+            response_format=PolicyCategoryRequest,
+        )
+    if grounded:
+        semantic_cache.store(context.user_message, query_vector, result)
+
+    await context.remember(result.answer)
+
+    return result
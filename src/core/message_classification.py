@@ -4,33 +4,30 @@ from typing import Any
 from langfuse.decorators import observe
 
 from src.config import settings
-from src.schemas import MessageRequestType
+from src.core.request_context import RequestContext
+from src.schemas import MessageRequestType, RoutedMessageRequest
 from src.utils import (
-    get_interactions_from_db,
-    get_langfuse_client,
-    get_openai_client,
-    save_interaction_to_db,
+    get_async_openai_client,
+    get_completion_cache,
 )
 
-# Access the clients
-openai_client = get_openai_client()
-langfuse_client = get_langfuse_client()
-
 
 @observe()
-def route_message_request(
-    user_input: str, client: Any = openai_client, model_name: str = settings.MODEL_NAME
+async def route_message_request(
+    context: RequestContext,
+    client: Any = None,
+    model_name: str = settings.MODEL_NAME,
 ) -> MessageRequestType:
     """
     Routes the message request to the appropriate LLM endpoint to determine the type of request.
 
-    This function takes the user's input, processes it with historical interactions from the database,
+    This function takes the user's input, combines it with the conversation history from the request context,
     and sends the relevant context to the LLM. It then parses the LLM's response and routes the message accordingly.
 
     Args:
-        client (Any): The LLM client to make the request.
+        client (Any, optional): The LLM client. Defaults to the shared async client.
         model_name (str): The name of the model to be used for processing.
-        user_input (str): The current user's input message.
+        context (RequestContext): The current user's message and conversation history.
 
     Returns:
         MessageRequestType: A Pydantic model containing the request type, confidence score, and description.
@@ -38,44 +35,72 @@ def route_message_request(
     """Router LLM call to determine the type of request with memory"""
     logging.info("Routing message request with memory")
 
-    # Retrieve last 5 interactions from DB
-    interactions = get_interactions_from_db()
-
     # Prepare messages with history + the current user input
-    messages = [
-        {
-            "role": "system",
-            "content": "Determine if this is a request to track_packages, change_user_data, shipping_guidance, lost_packages.",
-        },
-        {
-            "role": "system",
-            "content": "These are the last five messages of previous conversation but You do not need to use these pieces of information if not relevant:\n"
-            + "\n".join(
-                [
-                    f"User: {interaction[0]}\nAssistant: {interaction[1]}"
-                    for interaction in interactions
-                ]
-            )
-            + "\n\n(End of previous conversation)",
-        },
-        {"role": "user", "content": f"Current conversation: {user_input}"},
-    ]
+    messages = context.build_messages(
+        "Determine if this is a request to track_packages, change_user_data, shipping_guidance, lost_packages."
+    )
 
     # Call the LLM to get a response
     logging.info("Calling the LLM...")
-    completion = client.beta.chat.completions.parse(
+    result = await get_completion_cache().parse(
+        client or get_async_openai_client(),
+        stage="classification",
         model=model_name,
         messages=messages,
         response_format=MessageRequestType,
     )
-
-    # Parse the result
-    result = completion.choices[0].message.parsed
     logging.info(
         f"Request routed as: {result.request_type} with confidence: {result.confidence_score}"
     )
 
     # Save the new interaction to the DB (with the LLM's response)
-    save_interaction_to_db(question=user_input, response=result.description)
+    await context.remember(result.description)
+
+    return result
+
+
+@observe()
+async def route_and_extract_message_request(
+    context: RequestContext,
+    client: Any = None,
+    model_name: str = settings.MODEL_NAME,
+) -> RoutedMessageRequest:
+    """
+    Classifies the message and extracts the parameters its handler needs in a
+    single LLM call.
+
+    The response is a discriminated union keyed on ``request_type``: a tracking
+    code, a profile field and value, or a policy search query and collection.
+
+    Args:
+        context (RequestContext): The current user's message and conversation history.
+        client (Any, optional): The LLM client. Defaults to the shared async client.
+        model_name (str): The name of the model to be used for processing.
+
+    Returns:
+        RoutedMessageRequest: The intent with its parameters, confidence score and description.
+    """
+    logging.info("Routing and extracting message request with memory")
+
+    messages = context.build_messages(
+        "Determine if this is a request to track_packages, update_users_data, "
+        "shipping_guidance or lost_packages, and extract its parameters: the "
+        "tracking codes (each must start with PKG), the profile field and new value, "
+        "or a search query and the policy collection to search."
+    )
+
+    result = await get_completion_cache().parse(
+        client or get_async_openai_client(),
+        stage="classification",
+        model=model_name,
+        messages=messages,
+        response_format=RoutedMessageRequest,
+    )
+    logging.info(
+        f"Request routed as: {result.intent.request_type} with confidence: {result.confidence_score}"
+    )
+
+    # Save the new interaction to the DB (with the LLM's response)
+    await context.remember(result.description)
 
     return result
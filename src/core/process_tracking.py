@@ -1,81 +1,29 @@
 import logging
-from typing import Any
+from typing import Any, Dict, List, Optional, Tuple
 
 from langfuse.decorators import observe
 
 from src.config import settings
+from src.core.request_context import RequestContext
 from src.schemas import TrackingPackageRequest
 from src.utils import (
-    get_interactions_from_db,
-    get_langfuse_client,
-    get_latest_tracking_info,
-    get_openai_client,
-    save_interaction_to_db,
+    get_async_openai_client,
+    get_completion_cache,
+    get_tracking_cache,
+    request_stage_seconds,
 )
 
-# Access the clients
-openai_client = get_openai_client()
-langfuse_client = get_langfuse_client()
 
-
-@observe()
-def process_tracking_package_request(
-    user_input: str, client: Any = openai_client, model_name: str = settings.MODEL_NAME
-) -> str:
-    """Process and track package requests using LLM and database queries.
+def format_tracking_response(output_query: Optional[Dict[str, Any]]) -> str:
+    """Formats tracking information, or the not-found message, for WhatsApp.
 
     Args:
-        user_input (str): User's query containing tracking information.
-        client (Any): OpenAI client for LLM interaction.
-        model_name (str): Model name for LLM processing.
+        output_query (dict, optional): Latest tracking info from the tracking cache.
     Returns:
-        str: A formatted tracking response message or an error message.
+        str: The reply sent to the user.
     """
-
-    logging.info("Processing tracking request.")
-
-    # Retrieve last 5 interactions from the database
-    interactions = get_interactions_from_db()
-
-    try:
-        # Step 1: Use LLM to extract tracking number
-        completion = client.beta.chat.completions.parse(
-            model=model_name,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "Extract the tracking number. It must start with PKG.",
-                },
-                {
-                    "role": "system",
-                    "content": "These are the last five messages of previous conversation but You do not need to use these pieces of information if not relevant:\n"
-                    + "\n".join(
-                        [
-                            f"User: {interaction[0]}\nAssistant: {interaction[1]}"
-                            for interaction in interactions
-                        ]
-                    )
-                    + "\n\n(End of previous conversation)",
-                },
-                {"role": "user", "content": f"Current conversation: {user_input}"},
-            ],
-            response_format=TrackingPackageRequest,
-        )
-
-        result = completion.choices[0].message.parsed
-
-        tracking_code = result.tracking_code
-        logging.info(f"Extracted Tracking Code: {tracking_code}")
-
-        # Step 2: Fetch the latest tracking info from the database
-        output_query = get_latest_tracking_info(tracking_code)
-
-        # Step 3: Save tracking request for logging purposes
-        save_interaction_to_db(question=user_input, response=result.description)
-
-        # Step 4: Return formatted response based on tracking results
-        if output_query:
-            response = f"""
+    if output_query:
+        return f"""
             📦 **Package Tracking Details** 📦
 
             🕒 **Last Update:** {output_query['last_update']}
@@ -85,14 +33,125 @@ def process_tracking_package_request(
 
             🔍 Check back for real-time updates!
             """
-        else:
-            response = """
+
+    return """
             ❌ **Tracking Error** ❌
 
             ⚠️ The tracking code you entered does not exist or has no updates available.
             Please double-check the code and try again.
             """
 
+
+def limit_tracking_codes(tracking_codes: List[str]) -> Tuple[List[str], int]:
+    """Upper-cases and de-duplicates tracking codes, keeping message order.
+
+    Args:
+        tracking_codes (list[str]): Codes as extracted from the message.
+    Returns:
+        tuple: The first ``tracking.max_codes_per_message`` distinct codes, and
+        how many further codes were dropped.
+    """
+    distinct = list(dict.fromkeys(code.strip().upper() for code in tracking_codes))
+    max_codes = settings.tracking.max_codes_per_message
+    return distinct[:max_codes], max(len(distinct) - max_codes, 0)
+
+
+def format_tracking_responses(
+    tracking_codes: List[str],
+    output_queries: Dict[str, Optional[Dict[str, Any]]],
+    omitted: int = 0,
+) -> str:
+    """Formats the tracking information of one or several packages for WhatsApp.
+
+    A single code keeps the detailed reply; several codes get one compact line
+    each, in the order the user listed them.
+
+    Args:
+        tracking_codes (list[str]): Upper-cased tracking codes, in message order.
+        output_queries (dict): Latest tracking info per code, None when unknown.
+        omitted (int): Codes left out because the message listed too many.
+    Returns:
+        str: The reply sent to the user.
+    """
+    if len(tracking_codes) == 1 and not omitted:
+        return format_tracking_response(output_queries.get(tracking_codes[0]))
+
+    lines = []
+    for tracking_code in tracking_codes:
+        info = output_queries.get(tracking_code)
+        if info:
+            lines.append(
+                f"• {tracking_code}: {info['status']}, {info['location']} "
+                f"({info['shipping_type']}, updated {info['last_update']})"
+            )
+        else:
+            lines.append(f"• {tracking_code}: ❌ not found")
+
+    response = f"📦 **Package Tracking Details ({len(tracking_codes)})** 📦\n\n"
+    response += "\n".join(lines)
+
+    if omitted:
+        response += (
+            f"\n\n⚠️ {omitted} more code(s) were not checked. "
+            "Please send them in another message."
+        )
+    return response
+
+
+@observe()
+async def process_tracking_package_request(
+    context: RequestContext,
+    extracted: Optional[TrackingPackageRequest] = None,
+    client: Any = None,
+    model_name: str = settings.MODEL_NAME,
+) -> str:
+    """Process and track package requests using LLM and database queries.
+
+    Args:
+        context (RequestContext): User's query containing tracking information, with history.
+        extracted (TrackingPackageRequest, optional): Tracking codes already extracted
+            by the combined router. When given, the extraction LLM call is skipped.
+        client (Any, optional): OpenAI client for LLM interaction. Defaults to
+            the shared async client.
+        model_name (str): Model name for LLM processing.
+    Returns:
+        str: A formatted tracking response message or an error message.
+    """
+
+    logging.info("Processing tracking request.")
+
+    try:
+        # Step 1: Use LLM to extract tracking number, unless the router already did
+        result = extracted
+        if result is None:
+            with request_stage_seconds.time(
+                stage="parameter_extraction", intent="track_packages"
+            ):
+                result = await get_completion_cache().parse(
+                    client or get_async_openai_client(),
+                    stage="tracking",
+                    model=model_name,
+                    messages=context.build_messages(
+                        "Extract every tracking number. Each must start with PKG."
+                    ),
+                    response_format=TrackingPackageRequest,
+                )
+
+        tracking_codes, omitted = limit_tracking_codes(result.tracking_codes)
+        logging.info(f"Extracted Tracking Codes: {tracking_codes}")
+        if not tracking_codes:
+            return format_tracking_response(None)
+
+        # Step 2: Fetch the latest tracking info of every code in one query,
+        # serving fresh codes from the cache
+        output_queries = await get_tracking_cache().aget_many(tracking_codes)
+
+        # Step 3: Save tracking request for logging purposes
+        await context.remember(result.description)
+
+        # Step 4: Return formatted response based on tracking results
+        response = format_tracking_responses(tracking_codes, output_queries, omitted)
+
         logging.info("Tracking response generated successfully.")
         return response
 
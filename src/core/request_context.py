@@ -0,0 +1,97 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from src.utils import get_conversation_memory
+
+HISTORY_PROMPT_TEMPLATE = (
+    "These are the last five messages of previous conversation but You do not need "
+    "to use these pieces of information if not relevant:\n"
+    "{history}"
+    "\n\n(End of previous conversation)"
+)
+
+
+def render_history_prompt(interactions: List[Tuple[str, str]]) -> str:
+    """
+    Renders previous interactions as the system prompt shared by every stage.
+
+    Args:
+        interactions (list): (question, response) tuples, most recent first.
+
+    Returns:
+        str: The conversation history prompt.
+    """
+    history = "\n".join(
+        [
+            f"User: {question}\nAssistant: {response}"
+            for question, response in interactions
+        ]
+    )
+    return HISTORY_PROMPT_TEMPLATE.format(history=history)
+
+
+@dataclass
+class RequestContext:
+    """
+    State shared by every stage that handles one user message.
+
+    The sender's conversation history is loaded and rendered once in
+    ``llm_router``, after the tracking fast path, and reused by the classifier
+    and the selected handler.
+    """
+
+    user_message: str
+    sender_id: str
+    interactions: List[Tuple[str, str]] = field(default_factory=list)
+    history_prompt: str = ""
+
+    @classmethod
+    async def load(cls, user_message: str, sender_id: str) -> "RequestContext":
+        """
+        Builds the context for a message, fetching the sender's conversation history.
+
+        Args:
+            user_message (str): The message sent by the user.
+            sender_id (str): WhatsApp ID of the sender.
+
+        Returns:
+            RequestContext: The populated context.
+        """
+        interactions = await get_conversation_memory().get_history(sender_id)
+        return cls(
+            user_message=user_message,
+            sender_id=sender_id,
+            interactions=interactions,
+            history_prompt=render_history_prompt(interactions),
+        )
+
+    def build_messages(self, instruction: str) -> List[Dict[str, str]]:
+        """
+        Assembles the chat messages for an LLM call: the stage instruction, the
+        shared history prompt and the current user message.
+
+        Args:
+            instruction (str): The stage-specific system instruction.
+
+        Returns:
+            list: Messages ready for the chat completions API.
+        """
+        return [
+            {"role": "system", "content": instruction},
+            {"role": "system", "content": self.history_prompt},
+            {"role": "user", "content": f"Current conversation: {self.user_message}"},
+        ]
+
+    async def remember(self, response: str) -> bool:
+        """
+        Records the answer to the current message in the sender's conversation.
+
+        Args:
+            response (str): The response to store alongside the user's message.
+
+        Returns:
+            bool: False if the interaction could not be queued for storage.
+        """
+        return await get_conversation_memory().append(
+            self.sender_id, self.user_message, response
+        )
@@ -1,27 +1,25 @@
+import asyncio
 import logging
-from typing import Any
+from typing import Any, Optional
 
 from langfuse.decorators import observe
 
 from src.config import settings
+from src.core.request_context import RequestContext
 from src.schemas import UserProfileUpdateRequest
 from src.utils import (
-    get_interactions_from_db,
-    get_langfuse_client,
-    get_openai_client,
+    get_async_openai_client,
+    get_completion_cache,
     query_to_update_users_data,
-    save_interaction_to_db,
+    request_stage_seconds,
 )
 
-# Access the clients
-openai_client = get_openai_client()
-langfuse_client = get_langfuse_client()
-
 
 @observe()
-def update_user_profile(
-    user_input: str,
-    client: Any = openai_client,
+async def update_user_profile(
+    context: RequestContext,
+    extracted: Optional[UserProfileUpdateRequest] = None,
+    client: Any = None,
     model_name: str = settings.MODEL_NAME,
     user_id: str = "06cecdbd-ac6b-45f5-84f7-c6a8631a4ed6",
 ) -> UserProfileUpdateRequest:
@@ -29,9 +27,11 @@ def update_user_profile(
     Processes a user profile update request using an LLM.
 
     Args:
-        client: LLM client for making API calls.
+        client: LLM client for making API calls. Defaults to the shared async client.
         model_name (str): The model name to use for parsing.
-        user_input (str): User's request describing the update.
+        context (RequestContext): User's request describing the update, with history.
+        extracted (UserProfileUpdateRequest, optional): Field and value already
+            extracted by the combined router. When given, the LLM call is skipped.
         user_id (str): The unique identifier of the user.
 
     Returns:
@@ -42,33 +42,20 @@ def update_user_profile(
 
     try:
 
-        # Retrieve last 5 interactions from the database
-        interactions = get_interactions_from_db()
-
-        completion = client.beta.chat.completions.parse(
-            model=model_name,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "Extract the field type the user would like to update.",
-                },
-                {
-                    "role": "system",
-                    "content": "These are the last five messages of previous conversation but You do not need to use these pieces of information if not relevant:\n"
-                    + "\n".join(
-                        [
-                            f"User: {interaction[0]}\nAssistant: {interaction[1]}"
-                            for interaction in interactions
-                        ]
-                    )
-                    + "\n\n(End of previous conversation)",
-                },
-                {"role": "user", "content": f"Current conversation: {user_input}"},
-            ],
-            response_format=UserProfileUpdateRequest,
-        )
-
-        result = completion.choices[0].message.parsed
+        result = extracted
+        if result is None:
+            with request_stage_seconds.time(
+                stage="parameter_extraction", intent="update_users_data"
+            ):
+                result = await get_completion_cache().parse(
+                    client or get_async_openai_client(),
+                    stage="profile",
+                    model=model_name,
+                    messages=context.build_messages(
+                        "Extract the field type the user would like to update."
+                    ),
+                    response_format=UserProfileUpdateRequest,
+                )
         logging.info(f"Extracted update request: {result}")
 
     except Exception as e:
@@ -78,14 +65,15 @@ def update_user_profile(
         return None
 
     try:
-        query_to_update_users_data(
+        await asyncio.to_thread(
+            query_to_update_users_data,
             user_id=user_id,
             reason=result.field_type,
             value_to_update=result.field_value,
         )
         logging.info(f"Successfully updated user {user_id}'s profile.")
 
-        save_interaction_to_db(question=user_input, response=result.description)
+        await context.remember(result.description)
     except Exception as e:
         logging.error(f"Database update failed for user {user_id}: {e}", exc_info=True)
         return None
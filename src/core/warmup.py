@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, get_args
+
+from src.config import settings
+from src.core.intent_classifier import get_intent_classifier
+from src.core.lost_item_and_shipping_info import get_policy_search_tools
+from src.schemas import SearchQdrantRequest
+from src.utils import (
+    fill_connection_pool,
+    get_async_openai_client,
+    get_embedding_service,
+    warm_vector_store,
+)
+
+WarmupStep = Callable[[], Awaitable[Any]]
+
+
+class Warmup:
+    """
+    Runs the startup warm-up steps in the background and reports readiness.
+
+    The steps run concurrently while the app already serves ``/ready``. Failed
+    steps, e.g. because Qdrant is still starting, are retried every
+    ``retry_seconds`` until all of them have succeeded.
+    """
+
+    def __init__(self, steps: Dict[str, WarmupStep], retry_seconds: float = 5.0):
+        self.steps = steps
+        self.retry_seconds = retry_seconds
+
+        self._status: Dict[str, Dict[str, Any]] = {
+            name: {"done": False, "seconds": None, "error": None} for name in steps
+        }
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        """True once every step has succeeded."""
+        return all(status["done"] for status in self._status.values())
+
+    async def start(self):
+        """Starts the warm-up in a background task."""
+        if self._task is None and not self.ready:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancels a warm-up that is still running."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the readiness and the duration or error of each step."""
+        return {
+            "ready": self.ready,
+            "steps": {name: dict(status) for name, status in self._status.items()},
+        }
+
+    async def _run(self):
+        start = time.perf_counter()
+        while True:
+            pending = [
+                name for name, status in self._status.items() if not status["done"]
+            ]
+            await asyncio.gather(*(self._run_step(name) for name in pending))
+            if self.ready:
+                break
+            await asyncio.sleep(self.retry_seconds)
+        logging.info(f"Warm-up finished in {time.perf_counter() - start:.2f}s")
+
+    async def _run_step(self, name: str):
+        status = self._status[name]
+        start = time.perf_counter()
+        try:
+            await self.steps[name]()
+        except Exception as error:
+            status["error"] = str(error)
+            logging.warning(f"Warm-up step '{name}' failed: {error}")
+            return
+        status.update(done=True, seconds=time.perf_counter() - start, error=None)
+        logging.info(f"Warm-up step '{name}' done in {status['seconds']:.2f}s")
+
+
+async def warm_embedding_model():
+    """Loads the embedding model and runs one encode through the batching worker."""
+    await get_embedding_service().aencode(settings.warmup.encode_text)
+
+
+async def warm_database_pool():
+    """Opens the database pool's persistent connections."""
+    await asyncio.to_thread(fill_connection_pool)
+
+
+async def warm_vector_store_collections():
+    """Connects to the vector store and checks the policy collections exist."""
+    collection_names = get_args(
+        SearchQdrantRequest.model_fields["collection_name"].annotation
+    )
+    await warm_vector_store(collection_names)
+
+
+async def warm_llm_client():
+    """Imports the OpenAI SDK and creates the shared async client."""
+    await asyncio.to_thread(get_async_openai_client)
+
+
+async def warm_prompts():
+    """Builds the JSON schemas offered to the LLM as tools."""
+    get_policy_search_tools()
+
+
+async def warm_intent_classifier():
+    """Loads the trained intent centroids, if local routing is enabled."""
+    await asyncio.to_thread(get_intent_classifier)
+
+
+WARMUP_STEPS: Dict[str, WarmupStep] = {
+    "embedding_model": warm_embedding_model,
+    "database_pool": warm_database_pool,
+    "vector_store": warm_vector_store_collections,
+    "llm_client": warm_llm_client,
+    "prompts": warm_prompts,
+    "intent_classifier": warm_intent_classifier,
+}
+
+_warmup = None
+
+
+def get_warmup() -> Warmup:
+    """Return the process-wide warm-up, with no steps when it is disabled."""
+    global _warmup
+
+    if _warmup is None:
+        warmup_config = settings.warmup
+        _warmup = Warmup(
+            steps=WARMUP_STEPS if warmup_config.enabled else {},
+            retry_seconds=warmup_config.retry_seconds,
+        )
+    return _warmup
@@ -1,10 +1,17 @@
 import logging
-import os
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
 
-import httpx
 from fastapi import APIRouter, FastAPI, Request, Response
 
+from src.config import settings
 from src.core import llm_router
+from src.utils import (
+    TaskQueue,
+    create_task_queue,
+    get_whatsapp_sender,
+)
 
 app = FastAPI()
 
@@ -13,13 +20,190 @@ app = FastAPI()
 whatsapp_router = APIRouter()
 
 
+@dataclass
+class MessageJob:
+    """One sender's messages from a webhook delivery, waiting to be answered in order."""
+
+    sender_id: str
+    messages: List[str]
+    message_ids: List[str] = field(default_factory=list)
+    replies: List[str] = field(default_factory=list)
+    sent: int = 0
+
+
+# The job queued, running or waiting for a retry for each sender. Messages
+# that arrive meanwhile are appended to it, so a sender occupies at most one
+# queue worker and their messages are answered in order
+_sender_jobs: Dict[str, MessageJob] = {}
+
+
+def submit_message_job(job: MessageJob) -> bool:
+    """
+    Hands a sender's new messages to their pending job, or queues a new job
+    when the sender has none.
+
+    Args:
+        job (MessageJob): The messages of one sender from a webhook delivery.
+
+    Returns:
+        bool: False if the queue rejected the job.
+    """
+    pending = _sender_jobs.get(job.sender_id)
+    if pending is not None:
+        pending.messages.extend(job.messages)
+        pending.message_ids.extend(job.message_ids)
+        return True
+
+    if not get_message_queue().enqueue(job):
+        return False
+    _sender_jobs[job.sender_id] = job
+    return True
+
+
+def release_message_job(job: MessageJob):
+    """Forgets a finished or dropped job, so the sender's next messages get a new one."""
+    if _sender_jobs.get(job.sender_id) is job:
+        del _sender_jobs[job.sender_id]
+    if job.sent < len(job.messages):
+        logging.error(
+            f"Dropping {len(job.messages) - job.sent} unanswered messages "
+            f"from {job.sender_id}"
+        )
+
+
+async def answer_messages(job: MessageJob):
+    """
+    Answers a job's messages in order, sending each reply as soon as it is
+    generated, including messages appended to the job while it runs.
+
+    Generated and delivered replies are kept on the job, so a retry resumes at
+    the first undelivered reply without running the LLM pipeline again.
+
+    Args:
+        job (MessageJob): The messages to answer.
+
+    Raises:
+        RuntimeError: If a reply could not be delivered.
+    """
+    while job.sent < len(job.messages):
+        index = job.sent
+        if index == len(job.replies):
+            job.replies.append(await llm_router(job.messages[index], job.sender_id))
+
+        if not await send_whatsapp_message(job.sender_id, job.replies[index]):
+            raise RuntimeError(f"Failed to send reply to {job.sender_id}")
+        job.sent += 1
+
+
+async def process_message_job(job: MessageJob):
+    """
+    Answers a sender's pending messages, then releases the sender's job.
+
+    A failed job stays registered while the queue waits to retry it, without
+    holding a worker, so the sender's later messages are appended to it and
+    cannot be answered first.
+
+    Args:
+        job (MessageJob): The messages to answer.
+
+    Raises:
+        RuntimeError: If a reply could not be delivered; the queue retries the job.
+    """
+    await answer_messages(job)
+    release_message_job(job)
+
+
+_message_queue = None
+
+
+def get_message_queue() -> TaskQueue:
+    """Return the queue that processes incoming messages in the background."""
+    global _message_queue
+
+    if _message_queue is None:
+        _message_queue = create_task_queue(
+            process_message_job, on_failure=release_message_job
+        )
+    return _message_queue
+
+
+# Recently queued message IDs, so that a delivery Meta sends again is not
+# answered twice
+_seen_message_ids: "OrderedDict[str, None]" = OrderedDict()
+
+
+def _mark_seen(message_id: str) -> bool:
+    """Records a message ID. Returns False if it was already seen."""
+    if message_id in _seen_message_ids:
+        return False
+    _seen_message_ids[message_id] = None
+    while len(_seen_message_ids) > settings.webhook.max_seen_message_ids:
+        _seen_message_ids.popitem(last=False)
+    return True
+
+
+def extract_message_jobs(payload: Dict[str, Any]) -> Tuple[List[MessageJob], int]:
+    """
+    Collects the text messages of every entry and change of a webhook payload,
+    grouped into one job per sender.
+
+    Meta batches several entries, changes and messages into one delivery
+    during bursts. Each sender's messages are ordered by timestamp; messages
+    already queued from an earlier delivery are skipped.
+
+    Args:
+        payload (dict): The webhook request body.
+
+    Returns:
+        tuple: The jobs, in order of each sender's first message, and the
+        number of messages and status updates in the payload.
+    """
+    messages = []
+    events = 0
+    for entry in payload.get("entry", []):
+        for change in entry.get("changes", []):
+            value = change.get("value", {})
+            for status in value.get("statuses", []):
+                events += 1
+                logging.info(
+                    f"📊 Status Update: {status.get('status')} (ID: {status.get('id')})"
+                )
+            for message in value.get("messages", []):
+                events += 1
+                logging.info(f"📩 Incoming Message: {message}")
+                if message.get("type", "text") != "text" or "text" not in message:
+                    logging.info(f"Ignoring {message.get('type')} message")
+                    continue
+                messages.append(message)
+
+    jobs: Dict[str, MessageJob] = {}
+    # Stable sort, so messages with the same timestamp keep their payload order
+    for message in sorted(messages, key=lambda m: int(m.get("timestamp", 0))):
+        message_id = message.get("id")
+        if message_id is not None and not _mark_seen(message_id):
+            logging.info(f"Skipping already queued message {message_id}")
+            continue
+
+        sender_id = message["from"]
+        job = jobs.setdefault(sender_id, MessageJob(sender_id=sender_id, messages=[]))
+        job.messages.append(message["text"]["body"])
+        if message_id is not None:
+            job.message_ids.append(message_id)
+
+    return list(jobs.values()), events
+
+
 @whatsapp_router.api_route("/webhook", methods=["GET", "POST"])
 async def handle_whatsapp_events(request: Request) -> Response:
     """
     Handles incoming messages and status updates from the WhatsApp Cloud API.
 
+    Every message of the delivery is queued, one job per sender, or appended
+    to the sender's pending job; the queue's workers answer different senders
+    concurrently, up to ``message_queue.concurrency`` at a time.
+
     Args:
-        request (Request): Incoming HTTP request containing message or status update.
+        request (Request): Incoming HTTP request containing messages or status updates.
 
     Returns:
         Response: HTTP response with appropriate status code and message.
@@ -27,38 +211,33 @@ async def handle_whatsapp_events(request: Request) -> Response:
     if request.method == "GET":
         logging.info("Received GET request for verification")
         params = request.query_params
-        if params.get("hub.verify_token") == os.getenv("VERIFY_TOKEN"):
+        if params.get("hub.verify_token") == settings.whatsapp.verify_token:
             return Response(content=params.get("hub.challenge"), status_code=200)
         return Response(content="Invalid verification token", status_code=403)
 
     try:
         logging.info("Processing incoming event...")
         payload = await request.json()
-        event_data = payload["entry"][0]["changes"][0]["value"]
-        logging.info(f"Event data: {event_data}")
-
-        if "messages" in event_data:
-            logging.info(f"📩 Incoming Message: {event_data['messages'][0]}")
-            user_message = event_data["messages"][0]
-            sender_id = user_message["from"]
-            message_content = user_message["text"]["body"]
-
-            bot_reply = llm_router(message_content)
-            response_status = await send_whatsapp_message(sender_id, bot_reply)
-
-            if response_status:
-                return {"status": "success", "message": "Processed"}
-            else:
-                return Response(content="Failed to send response", status_code=500)
-        elif "statuses" in event_data:
-            logging.info(
-                f"📊 Status Update: {event_data['statuses'][0]['status']} (ID: {event_data['statuses'][0]['id']})"
-            )
-            return Response(content="Status update received", status_code=200)
+        jobs, events = extract_message_jobs(payload)
 
-        else:
+        if not events:
             return Response(content="Unknown event type", status_code=400)
 
+        # Acknowledge right away and answer in the background
+        rejected = [job for job in jobs if not submit_message_job(job)]
+        if rejected:
+            # Forget the rejected messages so that Meta's retry queues them
+            for job in rejected:
+                for message_id in job.message_ids:
+                    _seen_message_ids.pop(message_id, None)
+            logging.warning(
+                f"Message queue is full, asking Meta to retry {len(rejected)} "
+                f"of {len(jobs)} senders later"
+            )
+            return Response(content="Server busy", status_code=503)
+
+        return {"status": "success", "message": "Queued", "senders": len(jobs)}
+
     except Exception as error:
         logging.error(f"Error handling event: {error}", exc_info=True)
         return Response(content="Internal server error", status_code=500)
@@ -69,42 +248,11 @@ async def send_whatsapp_message(recipient_id: str, message_text: str) -> bool:
     Sends a response message to a user via the WhatsApp Cloud API.
 
     Args:
-        from_number (str): The recipient's phone number.
-        response_text (str): The message content to be sent.
-        message_type (str, optional): The type of message (default is "text").
+        recipient_id (str): The recipient's phone number.
+        message_text (str): The message content to be sent.
 
     Returns:
         bool: True if the message was sent successfully, False otherwise.
     """
-    headers = {
-        "Authorization": "Bearer " + os.getenv("ACCESS_TOKEN"),
-        "Content-Type": "application/json",
-    }
-
-    message_payload = {
-        "messaging_product": "whatsapp",
-        "to": recipient_id,
-        "type": "text",
-        "text": {"body": message_text},
-    }
-
-    logging.info(f"Sending message to {recipient_id} with content: {message_payload}")
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"https://graph.facebook.com/{os.getenv('VERSION')}/{os.getenv('PHONE_NUMBER_ID')}/messages",
-                headers=headers,
-                json=message_payload,
-            )
-            logging.info(f"Response status code: {response.status_code}")
-
-            if response.status_code != 200:
-                logging.error(f"Error: {response.status_code}, {response.text}")
-                return False
-            return True
-    except httpx.RequestError as http_error:
-        logging.error(f"HTTP request error: {http_error}")
-        return False
-    except Exception as general_error:
-        logging.error(f"Unexpected error: {general_error}")
-        return False
+    logging.info(f"Sending message to {recipient_id}: {message_text}")
+    return await get_whatsapp_sender().send_text(recipient_id, message_text)
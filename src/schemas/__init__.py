@@ -1,8 +1,12 @@
 from .message import (
     MessageRequestType,
     PolicyCategoryRequest,
+    PolicyQuestionIntent,
+    RoutedMessageRequest,
     SearchQdrantRequest,
     TrackingPackageRequest,
+    TrackPackagesIntent,
+    UpdateUserDataIntent,
     UserMessage,
     UserProfileUpdateRequest,
 )
@@ -14,4 +18,8 @@ __all__ = [
     "PolicyCategoryRequest",
     "SearchQdrantRequest",
     "UserMessage",
+    "TrackPackagesIntent",
+    "UpdateUserDataIntent",
+    "PolicyQuestionIntent",
+    "RoutedMessageRequest",
 ]
@@ -1,4 +1,4 @@
-from typing import Literal
+from typing import List, Literal, Union
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -19,7 +19,9 @@ class MessageRequestType(BaseModel):
 class TrackingPackageRequest(BaseModel):
     """Router LLM call: Determine the tracking package request"""
 
-    tracking_code: str = Field(description="Extract the tracking code.")
+    tracking_codes: List[str] = Field(
+        description="Extract every tracking code mentioned, in order."
+    )
     confidence_score: float = Field(
         description="Confidence score of the update request, ranging from 0 to 1."
     )
@@ -71,6 +73,59 @@ class SearchQdrantRequest(BaseModel):
     model_config = ConfigDict(extra="forbid")  # Ensures no extra properties are allowed
 
 
+class TrackPackagesIntent(BaseModel):
+    """Parameters for a package tracking request."""
+
+    request_type: Literal["track_packages"] = Field(
+        description="Type of message requested by the user"
+    )
+    tracking_codes: List[str] = Field(
+        description="Extract every tracking code mentioned. Each must start with PKG."
+    )
+
+
+class UpdateUserDataIntent(BaseModel):
+    """Parameters for a user profile update request."""
+
+    request_type: Literal["update_users_data"] = Field(
+        description="Type of message requested by the user"
+    )
+    field_type: Literal["address", "city"] = Field(
+        description="The specific user profile field type to update."
+    )
+    field_value: str = Field(
+        description="The specific user profile field value to update."
+    )
+
+
+class PolicyQuestionIntent(BaseModel):
+    """Parameters for a shipping or lost package policy question."""
+
+    request_type: Literal["shipping_guidance", "lost_packages"] = Field(
+        description="Type of message requested by the user"
+    )
+    search_query: str = Field(
+        description="The user's question about company policy, rewritten for search."
+    )
+    collection_name: Literal["lost_package_policy", "shipping_information"] = Field(
+        description="The Qdrant collection to search in."
+    )
+
+
+class RoutedMessageRequest(BaseModel):
+    """Router LLM call: Classify the request and extract its parameters at once"""
+
+    intent: Union[TrackPackagesIntent, UpdateUserDataIntent, PolicyQuestionIntent] = (
+        Field(description="The request type together with its parameters.")
+    )
+    confidence_score: float = Field(
+        description="Confidence score of the update request, ranging from 0 to 1."
+    )
+    description: str = Field(
+        description="A cleaned and structured description of the update request."
+    )
+
+
 # Define request model
 class UserMessage(BaseModel):
     message: str
@@ -1,20 +1,124 @@
-from .clients import get_langfuse_client, get_openai_client
+from .clients import (
+    get_async_openai_client,
+    get_langfuse_client,
+    get_openai_client,
+)
+from .conversation_memory import ConversationMemory, get_conversation_memory
 from .custom_logging import setup_logging
 from .db import (
+    asearch_qdrant,
+    asearch_qdrant_collections,
+    close_qdrant_clients,
+    dispose_engine,
+    ensure_interactions_schema,
+    fill_connection_pool,
+    get_engine,
     get_interactions_from_db,
     get_latest_tracking_info,
+    get_latest_tracking_infos,
+    get_pool_stats,
+    get_async_qdrant_client,
+    get_qdrant_client,
+    get_qdrant_stats,
+    has_policy_context,
     query_to_update_users_data,
     save_interaction_to_db,
+    save_interactions_to_db,
     search_qdrant,
+    warm_vector_store,
+)
+from .embeddings import EmbeddingService, get_embedding_service
+from .ingestion import ingest_knowledge_base
+from .interaction_logger import InteractionLogger, get_interaction_logger
+from .llm_cache import CompletionCache, get_completion_cache
+from .local_index import LocalVectorIndex, get_local_index
+from .metrics import (
+    Histogram,
+    db_query_seconds,
+    embedding_encode_seconds,
+    render_histograms,
+    render_stats_gauges,
+    request_stage_seconds,
+    vector_search_seconds,
+    whatsapp_send_seconds,
+)
+from .semantic_cache import (
+    SemanticCache,
+    get_semantic_cache,
+    mark_knowledge_base_updated,
+)
+from .task_queue import (
+    InProcessTaskQueue,
+    TaskQueue,
+    create_task_queue,
+    retry_delay,
+)
+from .tracking_cache import (
+    TrackingCache,
+    get_tracking_cache,
+    install_tracking_notify_trigger,
+    start_tracking_listener,
+    stop_tracking_listener,
 )
+from .whatsapp import RateLimiter, WhatsAppSender, get_whatsapp_sender
 
 __all__ = [
     "setup_logging",
     "get_openai_client",
+    "get_async_openai_client",
     "get_langfuse_client",
     "get_interactions_from_db",
     "save_interaction_to_db",
     "get_latest_tracking_info",
     "query_to_update_users_data",
     "search_qdrant",
+    "get_engine",
+    "get_pool_stats",
+    "dispose_engine",
+    "get_qdrant_client",
+    "get_async_qdrant_client",
+    "close_qdrant_clients",
+    "get_qdrant_stats",
+    "asearch_qdrant",
+    "asearch_qdrant_collections",
+    "EmbeddingService",
+    "get_embedding_service",
+    "TaskQueue",
+    "InProcessTaskQueue",
+    "create_task_queue",
+    "ensure_interactions_schema",
+    "ConversationMemory",
+    "get_conversation_memory",
+    "save_interactions_to_db",
+    "InteractionLogger",
+    "get_interaction_logger",
+    "SemanticCache",
+    "get_semantic_cache",
+    "mark_knowledge_base_updated",
+    "CompletionCache",
+    "get_completion_cache",
+    "ingest_knowledge_base",
+    "LocalVectorIndex",
+    "get_local_index",
+    "TrackingCache",
+    "get_tracking_cache",
+    "install_tracking_notify_trigger",
+    "start_tracking_listener",
+    "stop_tracking_listener",
+    "get_latest_tracking_infos",
+    "Histogram",
+    "request_stage_seconds",
+    "db_query_seconds",
+    "embedding_encode_seconds",
+    "vector_search_seconds",
+    "whatsapp_send_seconds",
+    "render_histograms",
+    "render_stats_gauges",
+    "retry_delay",
+    "has_policy_context",
+    "fill_connection_pool",
+    "warm_vector_store",
+    "RateLimiter",
+    "WhatsAppSender",
+    "get_whatsapp_sender",
 ]
@@ -1,20 +1,62 @@
-from langfuse import Langfuse
-from openai import OpenAI
+import threading
+from typing import TYPE_CHECKING
 
 from src.config import settings
 
+if TYPE_CHECKING:
+    from langfuse import Langfuse
+    from openai import AsyncOpenAI, OpenAI
 
-def get_openai_client():
-    """Return the initialized OpenAI client."""
-    openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
-    return openai_client
+# Process-wide clients, created on first use so that importing the handlers
+# stays cheap and every handler shares one connection pool
+_openai_client = None
+_async_openai_client = None
+_langfuse_client = None
+_clients_lock = threading.Lock()
 
 
-def get_langfuse_client():
-    """Return the initialized LangFuse client."""
-    langfuse_client = Langfuse(
-        public_key=settings.LANGFUSE_PUBLIC_KEY,
-        secret_key=settings.LANGFUSE_SECRET_KEY,
-        host=settings.LANGFUSE_HOST,
-    )
-    return langfuse_client
+def get_openai_client() -> "OpenAI":
+    """Return the shared OpenAI client."""
+    global _openai_client
+
+    if _openai_client is None:
+        with _clients_lock:
+            if _openai_client is None:
+                from openai import OpenAI
+
+                _openai_client = OpenAI(
+                    api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL
+                )
+    return _openai_client
+
+
+def get_async_openai_client() -> "AsyncOpenAI":
+    """Return the shared async OpenAI client."""
+    global _async_openai_client
+
+    if _async_openai_client is None:
+        with _clients_lock:
+            if _async_openai_client is None:
+                from openai import AsyncOpenAI
+
+                _async_openai_client = AsyncOpenAI(
+                    api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL
+                )
+    return _async_openai_client
+
+
+def get_langfuse_client() -> "Langfuse":
+    """Return the shared LangFuse client."""
+    global _langfuse_client
+
+    if _langfuse_client is None:
+        with _clients_lock:
+            if _langfuse_client is None:
+                from langfuse import Langfuse
+
+                _langfuse_client = Langfuse(
+                    public_key=settings.LANGFUSE_PUBLIC_KEY,
+                    secret_key=settings.LANGFUSE_SECRET_KEY,
+                    host=settings.LANGFUSE_HOST,
+                )
+    return _langfuse_client
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Tuple
+
+from src.config import settings
+from src.utils.db import get_interactions_from_db
+from src.utils.interaction_logger import get_interaction_logger
+
+Interaction = Tuple[str, str]
+
+
+class ConversationMemory:
+    """
+    Recent conversation turns per WhatsApp sender.
+
+    Each sender's last ``max_turns`` interactions live in a ring buffer. Idle
+    senders are evicted least-recently-used first once ``max_senders`` buffers
+    are held. Writes go through to Postgres via the write-behind interaction
+    logger, and a sender missing from memory is loaded with the indexed
+    (sender_id, interaction_time) query.
+    """
+
+    def __init__(self, max_turns: int = 5, max_senders: int = 10000):
+        self.max_turns = max_turns
+        self.max_senders = max_senders
+        self._buffers: "OrderedDict[str, Deque[Interaction]]" = OrderedDict()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    async def get_history(self, sender_id: str) -> List[Interaction]:
+        """
+        Returns a sender's recent interactions, loading them on a cache miss.
+
+        Args:
+            sender_id (str): WhatsApp ID of the sender.
+
+        Returns:
+            list: (question, response) tuples, most recent first.
+        """
+        buffer = self._buffers.get(sender_id)
+        if buffer is not None:
+            self._counters["hits"] += 1
+            self._buffers.move_to_end(sender_id)
+            return list(reversed(buffer))
+
+        self._counters["misses"] += 1
+        interactions = await asyncio.to_thread(
+            get_interactions_from_db, limit=self.max_turns, sender_id=sender_id
+        )
+
+        # Another request may have filled the buffer while we were waiting
+        buffer = self._buffers.get(sender_id)
+        if buffer is None:
+            buffer = deque(reversed(interactions), maxlen=self.max_turns)
+            self._store(sender_id, buffer)
+        return list(reversed(buffer))
+
+    async def append(self, sender_id: str, question: str, response: str) -> bool:
+        """
+        Records a new interaction in memory and queues it for the database.
+
+        Args:
+            sender_id (str): WhatsApp ID of the sender.
+            question (str): User's input question.
+            response (str): LLM's generated response.
+
+        Returns:
+            bool: False if the interaction logger had to drop the row.
+        """
+        buffer = self._buffers.get(sender_id)
+        if buffer is not None:
+            buffer.append((question, response))
+            self._buffers.move_to_end(sender_id)
+
+        return await get_interaction_logger().log(
+            question=question, response=response, sender_id=sender_id
+        )
+
+    def forget(self, sender_id: str):
+        """Drops a sender's buffer so the next read reloads it from the database."""
+        self._buffers.pop(sender_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return buffer occupancy and hit/miss counters."""
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {
+            "senders": len(self._buffers),
+            "capacity": self.max_senders,
+            **self._counters,
+            "hit_rate": self._counters["hits"] / lookups if lookups else 0.0,
+        }
+
+    def _store(self, sender_id: str, buffer: Deque[Interaction]):
+        self._buffers[sender_id] = buffer
+        while len(self._buffers) > self.max_senders:
+            evicted, _ = self._buffers.popitem(last=False)
+            self._counters["evictions"] += 1
+            logging.debug(f"Evicted conversation memory for sender {evicted}")
+
+
+_conversation_memory = None
+
+
+def get_conversation_memory() -> ConversationMemory:
+    """Return the process-wide conversation memory."""
+    global _conversation_memory
+
+    if _conversation_memory is None:
+        _conversation_memory = ConversationMemory(
+            max_turns=settings.conversation_memory.max_turns,
+            max_senders=settings.conversation_memory.max_senders,
+        )
+    return _conversation_memory
@@ -6,8 +6,6 @@ import os
 from src.config import settings
 
 log_dir = os.path.join(os.path.dirname(__file__), "../../logs")
-if not os.path.exists(log_dir):
-    os.makedirs(log_dir)
 
 LOG_CONFIG = {
     "version": 1,
@@ -41,4 +39,12 @@ LOG_CONFIG = {
 
 
 def setup_logging():
+    """
+    Configures console and rotating file logging.
+
+    Called by the entry points (the app and the CLIs) rather than on import, so
+    importing the package neither touches the file system nor replaces the
+    caller's logging configuration.
+    """
+    os.makedirs(log_dir, exist_ok=True)
     logging.config.dictConfig(LOG_CONFIG)
@@ -1,57 +1,231 @@
+import asyncio
 import logging
+import threading
+import time
 import uuid
+from collections import defaultdict
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
 
-from qdrant_client import QdrantClient
-from sqlalchemy import create_engine, text
+from sqlalchemy import column, create_engine, insert, table, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 
 from src.config import settings
-from src.utils.custom_logging import setup_logging
+from src.utils.embeddings import get_embedding_service
+from src.utils.local_index import get_local_index
+from src.utils.metrics import LatencyStats, db_query_seconds, vector_search_seconds
 
-# Set up logging system
-setup_logging()
+if TYPE_CHECKING:
+    from qdrant_client import AsyncQdrantClient, QdrantClient, models
+
+# Lightweight table definition used for bulk inserts
+user_llm_interactions_table = table(
+    "user_llm_interactions",
+    column("id"),
+    column("sender_id"),
+    column("question"),
+    column("response"),
+    column("interaction_time"),
+)
+
+# Process-wide engine and session factory, created on first use
+_engine = None
+_session_factory = None
+_engine_lock = threading.Lock()
+
+# Time spent waiting for a pooled connection
+_pool_wait_stats = LatencyStats()
+
+# Long-lived Qdrant clients, created on first use
+_qdrant_client = None
+_async_qdrant_client = None
+_qdrant_lock = threading.Lock()
+
+# Search latency per collection
+_qdrant_search_stats: Dict[str, LatencyStats] = defaultdict(LatencyStats)
+
+
+def get_engine() -> Engine:
+    """
+    Returns the process-wide SQLAlchemy engine, creating it on first use.
+
+    The engine owns a bounded connection pool configured from the ``database``
+    section of ``config/config.yaml``.
+
+    Returns:
+        Engine: The shared database engine.
+    """
+    global _engine, _session_factory
+
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                interactions_db_url = f"{settings.database_url}/postal_service"
+                pool_config = settings.database
+                logging.info(
+                    f"Creating database engine (pool_size={pool_config.pool_size}, "
+                    f"max_overflow={pool_config.max_overflow})"
+                )
+                _engine = create_engine(
+                    interactions_db_url,
+                    pool_size=pool_config.pool_size,
+                    max_overflow=pool_config.max_overflow,
+                    pool_timeout=pool_config.pool_timeout,
+                    pool_recycle=pool_config.pool_recycle,
+                    pool_pre_ping=pool_config.pool_pre_ping,
+                )
+                _session_factory = sessionmaker(bind=_engine)
+    return _engine
 
 
 def get_db_session():
     """
-    Initializes a database connection and returns a session factory.
+    Returns the session factory bound to the shared database engine.
 
     Returns:
         sessionmaker: A session factory bound to the database engine.
     """
-    interactions_db_url = f"{settings.database_url}/postal_service"
-    engine = create_engine(interactions_db_url)
-    return sessionmaker(bind=engine)
+    get_engine()
+    return _session_factory
+
+
+@contextmanager
+def session_scope():
+    """
+    Opens a session on the shared engine and eagerly checks out its connection,
+    recording how long the pool made us wait.
+
+    Yields:
+        Session: An open database session.
+    """
+    SessionLocal = get_db_session()
+    with SessionLocal() as session:
+        start = time.perf_counter()
+        session.connection()
+        _pool_wait_stats.observe(time.perf_counter() - start)
+        yield session
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Reports the state of the connection pool, useful for sizing it against the
+    number of workers.
+
+    Returns:
+        dict: Pool size, checked-out and overflow connections, and checkout wait times.
+    """
+    if _engine is None:
+        return {"initialized": False}
+
+    pool = _engine.pool
+    return {
+        "initialized": True,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "wait": _pool_wait_stats.snapshot(),
+    }
+
+
+def fill_connection_pool() -> int:
+    """
+    Opens ``database.pool_size`` connections up front and returns them to the
+    pool, so the first requests after startup skip connection setup.
+
+    Returns:
+        int: The number of connections opened.
+    """
+    engine = get_engine()
+    connections = []
+    try:
+        # Hold every connection until the end so each one is a new connection
+        for _ in range(settings.database.pool_size):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
+def dispose_engine():
+    """Closes every pooled connection and drops the shared engine."""
+    global _engine, _session_factory
+
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
+            _session_factory = None
+
+
+def ensure_interactions_schema():
+    """
+    Adds the sender column and the (sender_id, interaction_time) index used to
+    look up a single sender's conversation. Run once per deployment with
+    ``python -m src.utils.migrate``; safe to run again.
+    """
+    statements = [
+        """
+        ALTER TABLE user_llm_interactions
+        ADD COLUMN IF NOT EXISTS sender_id VARCHAR(32);
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS ix_user_llm_interactions_sender_time
+        ON user_llm_interactions (sender_id, interaction_time);
+        """,
+    ]
+
+    with session_scope() as session:
+        for statement in statements:
+            session.execute(text(statement))
+        session.commit()
 
+    logging.info("Interaction table schema is up to date.")
 
-def get_interactions_from_db(limit: int = 5):
+
+@db_query_seconds.timed(helper="get_interactions_from_db")
+def get_interactions_from_db(limit: int = 5, sender_id: Optional[str] = None):
     """
     Retrieve the last `limit` user interactions with the LLM from the database.
 
     Args:
         limit (int): Number of recent interactions to fetch. Default is 5.
+        sender_id (str, optional): Only return interactions with this WhatsApp sender.
 
     Returns:
         list: A list of tuples containing (question, response) from user interactions.
     """
     try:
-        logging.info("Get the database session.")
-        SessionLocal = get_db_session()
-
-        query = text(
-            """
-            SELECT question, response
-            FROM user_llm_interactions
-            ORDER BY interaction_time DESC
-            LIMIT :limit;
-            """
-        )
+        if sender_id is None:
+            query = text(
+                """
+                SELECT question, response
+                FROM user_llm_interactions
+                ORDER BY interaction_time DESC
+                LIMIT :limit;
+                """
+            )
+        else:
+            query = text(
+                """
+                SELECT question, response
+                FROM user_llm_interactions
+                WHERE sender_id = :sender_id
+                ORDER BY interaction_time DESC
+                LIMIT :limit;
+                """
+            )
 
-        # Open a new session
-        with SessionLocal() as session:
-            result = session.execute(query, {"limit": limit}).fetchall()
+        # Borrow a pooled connection
+        with session_scope() as session:
+            result = session.execute(
+                query, {"limit": limit, "sender_id": sender_id}
+            ).fetchall()
             interactions = [(row[0], row[1]) for row in result]
 
         logging.info(f"Retrieved {len(interactions)} interactions from the database.")
@@ -62,36 +236,38 @@ def get_interactions_from_db(limit: int = 5):
         return []
 
 
-def save_interaction_to_db(question: str, response: str):
+@db_query_seconds.timed(helper="save_interaction_to_db")
+def save_interaction_to_db(
+    question: str, response: str, sender_id: Optional[str] = None
+):
     """
     Saves a user interaction (question & response) into the PostgreSQL database.
 
     Args:
         question (str): User's input question.
         response (str): LLM's generated response.
+        sender_id (str, optional): WhatsApp ID of the user who asked.
 
     Returns:
         bool: True if the interaction is successfully saved, False otherwise.
     """
     try:
-        logging.info("Get the database session.")
-        SessionLocal = get_db_session()
-
         interaction_id = uuid.uuid4()  # Generate a unique ID
 
         query = text(
             """
-            INSERT INTO user_llm_interactions (id, question, response, interaction_time)
-            VALUES (:id, :question, :response, :interaction_time);
+            INSERT INTO user_llm_interactions (id, sender_id, question, response, interaction_time)
+            VALUES (:id, :sender_id, :question, :response, :interaction_time);
         """
         )
 
         # Use a context manager for session handling
-        with SessionLocal() as session:
+        with session_scope() as session:
             session.execute(
                 query,
                 {
                     "id": interaction_id,
+                    "sender_id": sender_id,
                     "question": question,
                     "response": response,
                     "interaction_time": datetime.now(),
@@ -107,6 +283,29 @@ def save_interaction_to_db(question: str, response: str):
         return False
 
 
+@db_query_seconds.timed(helper="save_interactions_to_db")
+def save_interactions_to_db(rows: List[Dict[str, Any]]) -> int:
+    """
+    Inserts many interactions in one transaction using a multi-row INSERT.
+
+    Args:
+        rows (list): Dicts with id, sender_id, question, response and interaction_time.
+
+    Returns:
+        int: The number of rows written.
+    """
+    if not rows:
+        return 0
+
+    with session_scope() as session:
+        session.execute(insert(user_llm_interactions_table), rows)
+        session.commit()
+
+    logging.info(f"Saved {len(rows)} user interactions.")
+    return len(rows)
+
+
+@db_query_seconds.timed(helper="get_latest_tracking_info")
 def get_latest_tracking_info(tracking_code: str):
     """
     Retrieve the latest tracking information for a given tracking code.
@@ -130,10 +329,8 @@ def get_latest_tracking_info(tracking_code: str):
     """
     )
 
-    SessionLocal = get_db_session()
-
     # Use a context manager for session handling
-    with SessionLocal() as session:
+    with session_scope() as session:
         result = session.execute(query, {"tracking_code": tracking_code}).fetchone()
 
     if result:
@@ -148,6 +345,50 @@ def get_latest_tracking_info(tracking_code: str):
         return None  # No record found
 
 
+@db_query_seconds.timed(helper="get_latest_tracking_infos")
+def get_latest_tracking_infos(tracking_codes: Sequence[str]) -> Dict[str, Dict]:
+    """
+    Retrieve the latest tracking information for several tracking codes with
+    a single query.
+
+    Args:
+        tracking_codes (Sequence[str]): The package tracking codes.
+
+    Returns:
+        dict: Tracking information keyed by tracking code; codes without any
+        record are left out.
+    """
+    if not tracking_codes:
+        return {}
+
+    logging.info("Fetching tracking information for %d codes", len(tracking_codes))
+
+    # tracking_code is the primary key, so its index serves this lookup
+    query = text(
+        """
+        SELECT tracking_code, last_update, location, status, shipping_type
+        FROM package_tracking
+        WHERE tracking_code = ANY(:tracking_codes)
+    """
+    )
+
+    with session_scope() as session:
+        rows = session.execute(
+            query, {"tracking_codes": list(tracking_codes)}
+        ).fetchall()
+
+    return {
+        tracking_code: {
+            "last_update": last_update,
+            "location": location,
+            "status": status,
+            "shipping_type": shipping_type,
+        }
+        for tracking_code, last_update, location, status, shipping_type in rows
+    }
+
+
+@db_query_seconds.timed(helper="query_to_update_users_data")
 def query_to_update_users_data(user_id: uuid.UUID, reason: str, value_to_update: str):
     """Update user data in the database.
 
@@ -181,10 +422,8 @@ def query_to_update_users_data(user_id: uuid.UUID, reason: str, value_to_update:
     )
 
     try:
-        SessionLocal = get_db_session()
-
         # Use a context manager for session handling
-        with SessionLocal() as session:
+        with session_scope() as session:
             session.execute(
                 query, {"user_id": user_id, "value_to_update": value_to_update}
             )
@@ -196,61 +435,277 @@ def query_to_update_users_data(user_id: uuid.UUID, reason: str, value_to_update:
         )
 
     except Exception as e:
-        session.rollback()
         logging.error(
             f"Failed to update {reason} for user {user_id}: {e}", exc_info=True
         )
         raise
 
 
+def get_qdrant_client() -> "QdrantClient":
+    """Return the process-wide synchronous Qdrant client, creating it on first use."""
+    global _qdrant_client
+
+    if _qdrant_client is None:
+        with _qdrant_lock:
+            if _qdrant_client is None:
+                from qdrant_client import QdrantClient
+
+                logging.info("Connecting to Qdrant...")
+                _qdrant_client = QdrantClient(url=settings.qdrant.url)
+    return _qdrant_client
+
+
+def get_async_qdrant_client() -> "AsyncQdrantClient":
+    """Return the async Qdrant client held for the lifetime of the app."""
+    global _async_qdrant_client
+
+    if _async_qdrant_client is None:
+        with _qdrant_lock:
+            if _async_qdrant_client is None:
+                from qdrant_client import AsyncQdrantClient
+
+                logging.info("Connecting to Qdrant (async)...")
+                _async_qdrant_client = AsyncQdrantClient(url=settings.qdrant.url)
+    return _async_qdrant_client
+
+
+async def close_qdrant_clients():
+    """Closes the shared Qdrant clients. Called on application shutdown."""
+    global _qdrant_client, _async_qdrant_client
+
+    if _async_qdrant_client is not None:
+        await _async_qdrant_client.close()
+        _async_qdrant_client = None
+    if _qdrant_client is not None:
+        _qdrant_client.close()
+        _qdrant_client = None
+
+
+async def warm_vector_store(collection_names: Sequence[str]):
+    """
+    Opens the configured vector store and checks every collection searched by
+    the app exists: the Qdrant client's connection for the "qdrant" backend, or
+    the memory-mapped files for the "local" backend.
+
+    Args:
+        collection_names (Sequence[str]): The collections to check.
+
+    Raises:
+        ValueError: If a collection is missing from the local index.
+    """
+    if settings.retrieval.backend == "local":
+        missing = get_local_index().preload(collection_names)
+        if missing:
+            raise ValueError(f"Local index has no collection {missing}")
+        return
+
+    client = get_async_qdrant_client()
+    quantized = settings.vector_store.quantization != "none"
+    for collection_name in collection_names:
+        collection = await client.get_collection(collection_name)
+        if quantized and collection.config.quantization_config is None:
+            logging.warning(
+                f"Qdrant collection '{collection_name}' is not quantized; "
+                "run python -m src.utils.ingestion to apply vector_store.quantization"
+            )
+
+
+def get_qdrant_stats() -> Dict[str, Dict[str, float]]:
+    """
+    Reports Qdrant search latency per collection.
+
+    Returns:
+        dict: Latency statistics keyed by collection name.
+    """
+    return {name: stats.snapshot() for name, stats in _qdrant_search_stats.items()}
+
+
+# Answers of the policy searches that carry no retrieved policy text
+POLICY_NOT_FOUND = "No relevant company policies found."
+POLICY_SEARCH_ERROR = "An error occurred while retrieving company policies."
+
+
+def has_policy_context(response: Dict[str, str]) -> bool:
+    """
+    Tells whether a policy search result holds retrieved policy text, rather
+    than the no-results or error message.
+
+    Args:
+        response (dict): A result of ``search_qdrant`` or ``asearch_qdrant``.
+
+    Returns:
+        bool: True if the answer can ground an LLM response.
+    """
+    return response.get("answer") not in (None, POLICY_NOT_FOUND, POLICY_SEARCH_ERROR)
+
+
+def _format_policy_results(search_results: List[Any]) -> Dict[str, str]:
+    """Joins the text of the top two hits into the answer returned to the LLM."""
+    if not search_results:
+        logging.warning(POLICY_NOT_FOUND)
+        return {"answer": POLICY_NOT_FOUND}
+
+    policy_texts = [
+        result.payload.get("text", "No text available") for result in search_results[:2]
+    ]
+    logging.info("Successfully retrieved policy information from Qdrant.")
+    return {"answer": "\n\n".join(policy_texts)}
+
+
+def _search_params() -> Optional["models.SearchParams"]:
+    """Return search params that rescore quantized collections, if enabled."""
+    vector_store_config = settings.vector_store
+    if vector_store_config.quantization == "none":
+        return None
+
+    from qdrant_client import models
+
+    return models.SearchParams(
+        quantization=models.QuantizationSearchParams(
+            rescore=vector_store_config.rescore,
+            oversampling=vector_store_config.oversampling,
+        )
+    )
+
+
 def search_qdrant(
     user_input: str,
-    embedding_model: Any,
+    embedding_model: Any = None,
     collection_name: str = "shipping_information",
     limit: int = 3,
 ) -> Dict[str, str]:
     """
     Searches a Qdrant vector store for relevant company policies.
 
+    With ``retrieval.backend: local`` the in-process index built by ingestion
+    is searched instead, without a network round trip.
+
     Args:
         user_input (str): The user's query.
         collection_name (str): The name of the Qdrant collection to search.
-        embedding_model: The embedding model used to encode the query.
-        client_connection: The Qdrant client connection.
+        embedding_model: The embedding model used to encode the query. Defaults to
+            the shared embedding service.
         limit (int, optional): The maximum number of results to retrieve. Default is 3.
 
     Returns:
         dict: A dictionary containing the retrieved policy text or a message if no results are found.
     """
-    logging.info("Connecting to Qdrant...")
-    client_connection = QdrantClient(
-        url=settings.qdrant.url,
-    )
-
     logging.info(
         f"Searching Qdrant collection '{collection_name}' for query: {user_input}"
     )
 
     try:
-        query_vector = embedding_model.encode(user_input).tolist()
+        if embedding_model is None:
+            query_vector = get_embedding_service().encode(user_input)
+        else:
+            query_vector = embedding_model.encode(user_input).tolist()
+
+        backend = settings.retrieval.backend
+        start = time.perf_counter()
+        with vector_search_seconds.time(backend=backend, collection=collection_name):
+            if backend == "local":
+                search_results = get_local_index().search(
+                    collection_name, query_vector, limit
+                )
+            else:
+                search_results = get_qdrant_client().search(
+                    collection_name=collection_name,
+                    query_vector=query_vector,
+                    limit=limit,
+                    with_payload=["text"],
+                    with_vectors=False,
+                    search_params=_search_params(),
+                )
+        _qdrant_search_stats[collection_name].observe(time.perf_counter() - start)
+
+        return _format_policy_results(search_results)
 
-        search_results = client_connection.search(
-            collection_name=collection_name, query_vector=query_vector, limit=limit
-        )
+    except Exception as e:
+        logging.error(f"Error occurred while searching Qdrant: {e}", exc_info=True)
+        return {"answer": POLICY_SEARCH_ERROR}
 
-        if not search_results:
-            logging.warning("No relevant company policies found.")
-            return {"answer": "No relevant company policies found."}
 
-        policy_texts = [
-            result.payload.get("text", "No text available")
-            for result in search_results[:2]
-        ]
-        response = {"answer": "\n\n".join(policy_texts)}
+async def asearch_qdrant(
+    user_input: str,
+    collection_name: str = "shipping_information",
+    limit: int = 3,
+    query_vector: Optional[List[float]] = None,
+) -> Dict[str, str]:
+    """
+    Async variant of ``search_qdrant`` using the shared async client.
 
-        logging.info("Successfully retrieved policy information from Qdrant.")
-        return response
+    Args:
+        user_input (str): The user's query.
+        collection_name (str): The name of the Qdrant collection to search.
+        limit (int, optional): The maximum number of results to retrieve. Default is 3.
+        query_vector (list[float], optional): A precomputed query embedding.
+
+    Returns:
+        dict: A dictionary containing the retrieved policy text or a message if no results are found.
+    """
+    logging.info(
+        f"Searching Qdrant collection '{collection_name}' for query: {user_input}"
+    )
+
+    try:
+        if query_vector is None:
+            query_vector = await get_embedding_service().aencode(user_input)
+
+        backend = settings.retrieval.backend
+        start = time.perf_counter()
+        with vector_search_seconds.time(backend=backend, collection=collection_name):
+            if backend == "local":
+                search_results = get_local_index().search(
+                    collection_name, query_vector, limit
+                )
+            else:
+                search_results = await get_async_qdrant_client().search(
+                    collection_name=collection_name,
+                    query_vector=query_vector,
+                    limit=limit,
+                    with_payload=["text"],
+                    with_vectors=False,
+                    search_params=_search_params(),
+                )
+        _qdrant_search_stats[collection_name].observe(time.perf_counter() - start)
+
+        return _format_policy_results(search_results)
 
     except Exception as e:
         logging.error(f"Error occurred while searching Qdrant: {e}", exc_info=True)
-        return {"answer": "An error occurred while retrieving company policies."}
+        return {"answer": POLICY_SEARCH_ERROR}
+
+
+async def asearch_qdrant_collections(
+    user_input: str,
+    collection_names: Sequence[str] = ("lost_package_policy", "shipping_information"),
+    limit: int = 3,
+) -> Dict[str, Dict[str, str]]:
+    """
+    Searches several collections with a single query embedding, for questions
+    whose category is ambiguous.
+
+    The query is encoded once and the per-collection searches run concurrently
+    over the shared client, since Qdrant scopes every request to one collection.
+
+    Args:
+        user_input (str): The user's query.
+        collection_names (Sequence[str]): The collections to search.
+        limit (int, optional): The maximum number of results per collection. Default is 3.
+
+    Returns:
+        dict: The retrieved policy text keyed by collection name.
+    """
+    query_vector = await get_embedding_service().aencode(user_input)
+    responses = await asyncio.gather(
+        *(
+            asearch_qdrant(
+                user_input,
+                collection_name=name,
+                limit=limit,
+                query_vector=query_vector,
+            )
+            for name in collection_names
+        )
+    )
+    return dict(zip(collection_names, responses))
@@ -0,0 +1,258 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Union
+
+from src.config import settings
+from src.utils.metrics import LatencyStats, embedding_encode_seconds
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+EMBEDDING_BACKENDS = ("torch", "onnx", "int8")
+
+
+def load_embedding_model(
+    model_name: str, backend: str = "torch", onnx_file: Optional[str] = None
+) -> "SentenceTransformer":
+    """
+    Loads a sentence-transformers model on the selected inference backend.
+
+    Args:
+        model_name (str): Hugging Face model name or local path.
+        backend (str): "torch" for PyTorch float32, "onnx" for ONNX Runtime
+            (requires ``optimum[onnxruntime]``), or "int8" for PyTorch with
+            dynamically int8-quantized linear layers.
+        onnx_file (str, optional): ONNX file inside the model repository, e.g. a
+            pre-quantized ``onnx/model_qint8_avx512_vnni.onnx``.
+
+    Returns:
+        SentenceTransformer: The loaded model, exposing the usual ``encode``.
+    """
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(
+            f"Unknown embedding backend '{backend}', expected one of {EMBEDDING_BACKENDS}"
+        )
+
+    # Imported here because it pulls in torch, which takes seconds to import
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "onnx":
+        model_kwargs = {"file_name": onnx_file} if onnx_file else None
+        return SentenceTransformer(
+            model_name, backend="onnx", model_kwargs=model_kwargs
+        )
+
+    model = SentenceTransformer(model_name)
+    if backend == "int8":
+        import torch
+
+        model = torch.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    return model
+
+
+class EmbeddingService:
+    """
+    Process-wide embedding model with micro-batching.
+
+    The model is loaded once, on first use, on the configured ``backend``.
+    Concurrent ``encode`` calls are queued and a single worker thread groups
+    them into one forward pass, waiting at most ``max_wait_ms`` for up to
+    ``max_batch_size`` texts.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        backend: str = "torch",
+        onnx_file: Optional[str] = None,
+    ):
+        self.model_name = model_name
+        self.backend = backend
+        self.onnx_file = onnx_file
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._requests: "queue.Queue[tuple[List[str], Future]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+
+        self._batch_stats = LatencyStats()
+        self._batch_sizes: List[int] = []
+        self._texts_encoded = 0
+
+    @property
+    def model(self) -> "SentenceTransformer":
+        """Return the underlying model, loading it on first access."""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    logging.info(
+                        f"Loading embedding model '{self.model_name}' "
+                        f"on the {self.backend} backend"
+                    )
+                    start = time.perf_counter()
+                    self._model = load_embedding_model(
+                        self.model_name, self.backend, self.onnx_file
+                    )
+                    logging.info(
+                        f"Embedding model loaded in {time.perf_counter() - start:.2f}s"
+                    )
+        return self._model
+
+    @property
+    def signature(self) -> str:
+        """Identifies the vector space: the model, its backend and its ONNX file."""
+        return f"{self.model_name}|{self.backend}|{self.onnx_file or ''}"
+
+    def encode(self, texts: Union[str, Sequence[str]]) -> Any:
+        """
+        Encodes one text or a list of texts, sharing a forward pass with any
+        other calls that arrive within the batching window.
+
+        Args:
+            texts (str | Sequence[str]): Text(s) to embed.
+
+        Returns:
+            list[float] | list[list[float]]: One vector for a single string,
+            otherwise one vector per input text.
+        """
+        return self.submit(texts).result()
+
+    async def aencode(self, texts: Union[str, Sequence[str]]) -> Any:
+        """
+        Async variant of ``encode``; the forward pass runs on the batching
+        thread, so the event loop is never blocked.
+
+        Args:
+            texts (str | Sequence[str]): Text(s) to embed.
+
+        Returns:
+            list[float] | list[list[float]]: Same as ``encode``.
+        """
+        return await asyncio.wrap_future(self.submit(texts))
+
+    def submit(self, texts: Union[str, Sequence[str]]) -> Future:
+        """
+        Queues texts for encoding without waiting for the result.
+
+        Args:
+            texts (str | Sequence[str]): Text(s) to embed.
+
+        Returns:
+            Future: Resolves to the same value ``encode`` would return.
+        """
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+
+        future: Future = Future()
+        if not batch:
+            future.set_result([])
+            return future
+
+        self._ensure_worker()
+        inner: Future = Future()
+        self._requests.put((batch, inner))
+
+        def _unwrap(done: Future):
+            error = done.exception()
+            if error is not None:
+                future.set_exception(error)
+            else:
+                vectors = done.result()
+                future.set_result(vectors[0] if single else vectors)
+
+        inner.add_done_callback(_unwrap)
+        return future
+
+    def stats(self) -> Dict[str, Any]:
+        """Return batching statistics for tuning the batch window."""
+        sizes = self._batch_sizes[-1000:]
+        return {
+            "backend": self.backend,
+            "model_loaded": self._model is not None,
+            "texts_encoded": self._texts_encoded,
+            "avg_batch_size": sum(sizes) / len(sizes) if sizes else 0.0,
+            "forward_pass": self._batch_stats.snapshot(),
+        }
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            with self._worker_lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(
+                        target=self._run, name="embedding-batcher", daemon=True
+                    )
+                    self._worker.start()
+
+    def _run(self):
+        while True:
+            pending = [self._requests.get()]
+            size = len(pending[0][0])
+            deadline = time.monotonic() + self.max_wait
+
+            # Collect more requests until the batch is full or the window closes
+            while size < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                pending.append(item)
+                size += len(item[0])
+
+            self._encode_pending(pending)
+
+    def _encode_pending(self, pending: List[tuple]):
+        texts = [text for batch, _ in pending for text in batch]
+        try:
+            start = time.perf_counter()
+            with embedding_encode_seconds.time(backend=self.backend):
+                vectors = self.model.encode(texts, batch_size=len(texts)).tolist()
+            self._batch_stats.observe(time.perf_counter() - start)
+        except Exception as error:
+            logging.error(f"Embedding batch failed: {error}", exc_info=True)
+            for _, future in pending:
+                future.set_exception(error)
+            return
+
+        self._texts_encoded += len(texts)
+        self._batch_sizes.append(len(texts))
+        del self._batch_sizes[:-1000]
+
+        offset = 0
+        for batch, future in pending:
+            future.set_result(vectors[offset : offset + len(batch)])
+            offset += len(batch)
+
+
+_embedding_service = None
+_embedding_service_lock = threading.Lock()
+
+
+def get_embedding_service() -> EmbeddingService:
+    """Return the process-wide embedding service."""
+    global _embedding_service
+
+    if _embedding_service is None:
+        with _embedding_service_lock:
+            if _embedding_service is None:
+                _embedding_service = EmbeddingService(
+                    model_name=settings.EMBEDDING_MODEL,
+                    max_batch_size=settings.embedding.max_batch_size,
+                    max_wait_ms=settings.embedding.max_wait_ms,
+                    backend=settings.embedding.backend,
+                    onnx_file=settings.embedding.onnx_file,
+                )
+    return _embedding_service
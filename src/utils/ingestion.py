@@ -0,0 +1,475 @@
+import argparse
+import glob
+import hashlib
+import logging
+import os
+import uuid
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+from src.config import settings
+from src.utils.custom_logging import setup_logging
+from src.utils.db import get_qdrant_client
+from src.utils.embeddings import get_embedding_service
+from src.utils.local_index import read_local_collection, write_local_collection
+from src.utils.semantic_cache import mark_knowledge_base_updated
+
+if TYPE_CHECKING:
+    from qdrant_client import QdrantClient, models
+
+
+def discover_documents(source_dir: str) -> Iterator[Tuple[str, str]]:
+    """
+    Yields the markdown documents of the knowledge base.
+
+    Each file is loaded into the collection named after its stem, e.g.
+    ``data/shipping_information.md`` into ``shipping_information``.
+
+    Args:
+        source_dir (str): Directory holding the ``*.md`` files.
+
+    Returns:
+        Iterator[tuple]: (collection name, file path) pairs, sorted by path.
+    """
+    for path in sorted(glob.glob(os.path.join(source_dir, "*.md"))):
+        yield os.path.splitext(os.path.basename(path))[0], path
+
+
+def chunk_document(content: str, chunk_size: int, chunk_overlap: int) -> List[str]:
+    """
+    Splits a document into overlapping chunks on paragraph, line and word
+    boundaries.
+
+    Args:
+        content (str): The document text.
+        chunk_size (int): Maximum chunk size in characters.
+        chunk_overlap (int): Characters shared between consecutive chunks.
+
+    Returns:
+        list[str]: The chunks, in document order.
+    """
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separators=["\n\n", "\n", " ", ""],
+        length_function=len,
+    )
+    return text_splitter.split_text(content)
+
+
+def content_hash(text: str, embedding_signature: str) -> str:
+    """
+    Return the SHA-256 hex digest that identifies a chunk's content and the
+    embedding model that produced its vector, so switching the model or its
+    backend re-embeds every chunk.
+    """
+    return hashlib.sha256(f"{embedding_signature}\n{text}".encode("utf-8")).hexdigest()
+
+
+def chunk_point_id(source: str, chunk_hash: str) -> str:
+    """
+    Return a deterministic point ID for a chunk, so re-ingesting an unchanged
+    chunk maps onto the point that already holds it.
+    """
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{source}#{chunk_hash}"))
+
+
+def load_document_chunks(
+    path: str, chunk_size: int, chunk_overlap: int
+) -> Dict[str, Tuple[str, str]]:
+    """
+    Reads and chunks a document.
+
+    Args:
+        path (str): Path to the markdown document.
+        chunk_size (int): Maximum chunk size in characters.
+        chunk_overlap (int): Characters shared between consecutive chunks.
+
+    Returns:
+        dict: Point ID to (chunk text, content hash), in document order.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    source = os.path.basename(path)
+    embedding_signature = get_embedding_service().signature
+    chunks: Dict[str, Tuple[str, str]] = {}
+    for chunk in chunk_document(content, chunk_size, chunk_overlap):
+        chunk_hash = content_hash(chunk, embedding_signature)
+        chunks.setdefault(chunk_point_id(source, chunk_hash), (chunk, chunk_hash))
+    return chunks
+
+
+def embed_chunks(
+    chunks: Dict[str, Tuple[str, str]], point_ids: List[str], batch_size: int
+) -> Iterator[Tuple[List[str], List[List[float]]]]:
+    """
+    Embeds the given chunks in batches through the shared embedding service.
+
+    Returns:
+        Iterator[tuple]: (point IDs, vectors) per batch.
+    """
+    embedding_service = get_embedding_service()
+    for start in range(0, len(point_ids), batch_size):
+        batch_ids = point_ids[start : start + batch_size]
+        yield batch_ids, embedding_service.encode([chunks[i][0] for i in batch_ids])
+
+
+def quantization_config(quantization: str) -> Optional["models.QuantizationConfig"]:
+    """
+    Builds the Qdrant quantization config for a collection.
+
+    Args:
+        quantization (str): "none", "scalar" (int8 per dimension) or "binary"
+            (one bit per dimension). Quantized vectors are kept in RAM; the
+            original vectors stay on disk for rescoring.
+
+    Returns:
+        QuantizationConfig or None: None when quantization is disabled.
+    """
+    from qdrant_client import models
+
+    if quantization == "scalar":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8, quantile=0.99, always_ram=True
+            )
+        )
+    if quantization == "binary":
+        return models.BinaryQuantization(
+            binary=models.BinaryQuantizationConfig(always_ram=True)
+        )
+    if quantization != "none":
+        raise ValueError(f"Unknown Qdrant quantization '{quantization}'")
+    return None
+
+
+def collection_quantization(config: Optional["models.QuantizationConfig"]) -> str:
+    """Return "none", "scalar" or "binary" for a collection's quantization config."""
+    if config is None:
+        return "none"
+    if getattr(config, "scalar", None) is not None:
+        return "scalar"
+    if getattr(config, "binary", None) is not None:
+        return "binary"
+    return type(config).__name__.lower()
+
+
+def ensure_collection(
+    client: "QdrantClient",
+    collection_name: str,
+    vector_size: int,
+    quantization: str = "none",
+):
+    """
+    Creates a cosine-distance collection unless it already exists.
+
+    An existing collection with another vector size holds vectors of a
+    previous embedding model, which are all replaced on ingestion anyway, so
+    it is recreated with the new size. An existing collection with another
+    quantization is updated in place; Qdrant rebuilds the quantized vectors
+    in the background.
+
+    Args:
+        client (QdrantClient): Qdrant client.
+        collection_name (str): Name of the collection.
+        vector_size (int): Dimension of the embedding vectors.
+        quantization (str): "none", "scalar" or "binary".
+    """
+    from qdrant_client import models
+
+    if client.collection_exists(collection_name):
+        collection_config = client.get_collection(collection_name).config
+        stored_size = collection_config.params.vectors.size
+        if stored_size == vector_size:
+            stored_quantization = collection_quantization(
+                collection_config.quantization_config
+            )
+            if stored_quantization != quantization:
+                logging.info(
+                    f"Changing the quantization of Qdrant collection "
+                    f"'{collection_name}' from {stored_quantization} to {quantization}"
+                )
+                client.update_collection(
+                    collection_name=collection_name,
+                    vectors_config={
+                        "": models.VectorParamsDiff(on_disk=quantization != "none")
+                    },
+                    quantization_config=(
+                        quantization_config(quantization) or models.Disabled.DISABLED
+                    ),
+                )
+            return
+        logging.warning(
+            f"Qdrant collection '{collection_name}' holds {stored_size}-dimensional "
+            f"vectors, recreating it for {vector_size} dimensions"
+        )
+        client.delete_collection(collection_name)
+
+    logging.info(
+        f"Creating Qdrant collection '{collection_name}' "
+        f"with {quantization} quantization"
+    )
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=models.VectorParams(
+            size=vector_size,
+            distance=models.Distance.COSINE,
+            on_disk=quantization != "none",
+        ),
+        quantization_config=quantization_config(quantization),
+    )
+
+
+def existing_chunk_hashes(
+    client: "QdrantClient", collection_name: str, page_size: int = 256
+) -> Dict[str, Optional[str]]:
+    """
+    Scrolls a collection for the content hash of every stored point.
+
+    Args:
+        client (QdrantClient): Qdrant client.
+        collection_name (str): Name of the collection.
+        page_size (int): Points fetched per scroll request.
+
+    Returns:
+        dict: Point ID to content hash (None for points ingested without one).
+    """
+    hashes = {}
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            limit=page_size,
+            offset=offset,
+            with_payload=["content_hash"],
+            with_vectors=False,
+        )
+        for point in points:
+            hashes[str(point.id)] = (point.payload or {}).get("content_hash")
+        if offset is None:
+            return hashes
+
+
+def ingest_document(
+    client: "QdrantClient",
+    collection_name: str,
+    path: str,
+    chunk_size: int = 500,
+    chunk_overlap: int = 100,
+    embed_batch_size: int = 128,
+    upsert_batch_size: int = 256,
+    vector_size: int = 1024,
+    quantization: str = "none",
+) -> Dict[str, int]:
+    """
+    Synchronizes one collection with one markdown document.
+
+    Only chunks whose content hash, which covers the embedding model, is not
+    stored yet are embedded and upserted, and points for chunks that no longer
+    exist in the document or were embedded by another model are deleted.
+
+    Args:
+        client (QdrantClient): Qdrant client.
+        collection_name (str): Target collection.
+        path (str): Path to the markdown document.
+        chunk_size (int): Maximum chunk size in characters.
+        chunk_overlap (int): Characters shared between consecutive chunks.
+        embed_batch_size (int): Chunks embedded per forward pass.
+        upsert_batch_size (int): Points sent per upsert request.
+        vector_size (int): Dimension of the embedding vectors.
+        quantization (str): Quantization of the collection, applied to an
+            existing collection when it differs.
+
+    Returns:
+        dict: Counts of added, unchanged and deleted chunks.
+    """
+    from qdrant_client import models
+
+    source = os.path.basename(path)
+    chunks = load_document_chunks(path, chunk_size, chunk_overlap)
+    embedding_signature = get_embedding_service().signature
+
+    ensure_collection(client, collection_name, vector_size, quantization)
+    stored = existing_chunk_hashes(client, collection_name)
+
+    new_ids = [point_id for point_id in chunks if point_id not in stored]
+    stale_ids = [point_id for point_id in stored if point_id not in chunks]
+
+    points = []
+    for batch_ids, vectors in embed_chunks(chunks, new_ids, embed_batch_size):
+        for point_id, vector in zip(batch_ids, vectors):
+            text, chunk_hash = chunks[point_id]
+            points.append(
+                models.PointStruct(
+                    id=point_id,
+                    vector=vector,
+                    payload={
+                        "text": text,
+                        "source": source,
+                        "content_hash": chunk_hash,
+                        "embedding_model": embedding_signature,
+                    },
+                )
+            )
+
+        # Upsert full pages as soon as they are ready to bound memory use
+        while len(points) >= upsert_batch_size:
+            client.upsert(
+                collection_name=collection_name, points=points[:upsert_batch_size]
+            )
+            del points[:upsert_batch_size]
+
+    if points:
+        client.upsert(collection_name=collection_name, points=points)
+
+    if stale_ids:
+        client.delete(
+            collection_name=collection_name,
+            points_selector=models.PointIdsList(points=stale_ids),
+        )
+
+    counts = {
+        "added": len(new_ids),
+        "unchanged": len(chunks) - len(new_ids),
+        "deleted": len(stale_ids),
+    }
+    logging.info(f"Ingested '{path}' into '{collection_name}': {counts}")
+    return counts
+
+
+def ingest_document_locally(
+    index_dir: str,
+    collection_name: str,
+    path: str,
+    chunk_size: int = 500,
+    chunk_overlap: int = 100,
+    embed_batch_size: int = 128,
+) -> Dict[str, int]:
+    """
+    Rebuilds one collection of the local vector index from a markdown document.
+
+    Vectors of chunks already in the index are reused, so only new chunks, and
+    every chunk after the embedding model or backend changed, are embedded;
+    chunks that no longer exist are dropped.
+
+    Args:
+        index_dir (str): Directory of the local index.
+        collection_name (str): Target collection.
+        path (str): Path to the markdown document.
+        chunk_size (int): Maximum chunk size in characters.
+        chunk_overlap (int): Characters shared between consecutive chunks.
+        embed_batch_size (int): Chunks embedded per forward pass.
+
+    Returns:
+        dict: Counts of added, unchanged and deleted chunks.
+    """
+    source = os.path.basename(path)
+    chunks = load_document_chunks(path, chunk_size, chunk_overlap)
+    embedding_signature = get_embedding_service().signature
+
+    stored_vectors = {}
+    existing = read_local_collection(index_dir, collection_name)
+    if existing is not None:
+        vectors, payloads = existing
+        stored_vectors = {
+            payload["id"]: vector for payload, vector in zip(payloads, vectors)
+        }
+
+    new_ids = [point_id for point_id in chunks if point_id not in stored_vectors]
+    for batch_ids, vectors in embed_chunks(chunks, new_ids, embed_batch_size):
+        stored_vectors.update(zip(batch_ids, vectors))
+
+    payloads = [
+        {
+            "id": point_id,
+            "text": text,
+            "source": source,
+            "content_hash": chunk_hash,
+            "embedding_model": embedding_signature,
+        }
+        for point_id, (text, chunk_hash) in chunks.items()
+    ]
+    write_local_collection(
+        index_dir,
+        collection_name,
+        [stored_vectors[point_id] for point_id in chunks],
+        payloads,
+    )
+
+    counts = {
+        "added": len(new_ids),
+        "unchanged": len(chunks) - len(new_ids),
+        "deleted": len(stored_vectors) - len(chunks),
+    }
+    logging.info(f"Indexed '{path}' locally as '{collection_name}': {counts}")
+    return counts
+
+
+def ingest_knowledge_base(
+    source_dir: Optional[str] = None, client: Optional["QdrantClient"] = None
+) -> Dict[str, Dict[str, int]]:
+    """
+    Synchronizes every markdown document in ``source_dir`` with its collection
+    and invalidates the semantic answer caches when anything changed.
+
+    Collections go to Qdrant, or to the local vector index when
+    ``retrieval.backend`` is "local".
+
+    Args:
+        source_dir (str, optional): Defaults to ``ingestion.source_dir``.
+        client (QdrantClient, optional): Defaults to the shared Qdrant client.
+
+    Returns:
+        dict: Per-collection counts of added, unchanged and deleted chunks.
+    """
+    ingestion_config = settings.ingestion
+    source_dir = source_dir or ingestion_config.source_dir
+    results = {}
+    for collection_name, path in discover_documents(source_dir):
+        if settings.retrieval.backend == "local":
+            results[collection_name] = ingest_document_locally(
+                settings.retrieval.local_index_dir,
+                collection_name,
+                path,
+                chunk_size=ingestion_config.chunk_size,
+                chunk_overlap=ingestion_config.chunk_overlap,
+                embed_batch_size=ingestion_config.embed_batch_size,
+            )
+            continue
+
+        client = client or get_qdrant_client()
+        results[collection_name] = ingest_document(
+            client,
+            collection_name,
+            path,
+            chunk_size=ingestion_config.chunk_size,
+            chunk_overlap=ingestion_config.chunk_overlap,
+            embed_batch_size=ingestion_config.embed_batch_size,
+            upsert_batch_size=ingestion_config.upsert_batch_size,
+            vector_size=ingestion_config.vector_size,
+            quantization=settings.vector_store.quantization,
+        )
+
+    if any(counts["added"] or counts["deleted"] for counts in results.values()):
+        mark_knowledge_base_updated(client)
+    return results
+
+
+def main():
+    """CLI to load the markdown knowledge base into the configured vector store."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--source-dir", default=settings.ingestion.source_dir)
+    args = parser.parse_args()
+    setup_logging()
+
+    for collection_name, counts in ingest_knowledge_base(args.source_dir).items():
+        print(
+            f"{collection_name}: {counts['added']} added, "
+            f"{counts['unchanged']} unchanged, {counts['deleted']} deleted"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Optional
+
+from src.config import settings
+from src.utils.db import save_interactions_to_db
+from src.utils.metrics import LatencyStats
+
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+
+class InteractionLogger:
+    """
+    Write-behind sink for conversation turns.
+
+    Rows are buffered in memory and written in bulk by a background task once
+    ``flush_size`` rows are pending or ``flush_interval_seconds`` has passed.
+    The buffer holds at most ``max_buffer`` rows; when it is full the
+    ``overflow_policy`` either drops the oldest row, drops the new row, or
+    makes the caller wait for the next flush.
+    """
+
+    def __init__(
+        self,
+        flush_size: int = 200,
+        flush_interval_seconds: float = 1.0,
+        max_buffer: int = 10000,
+        overflow_policy: str = "drop_oldest",
+    ):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Invalid overflow policy '{overflow_policy}'. "
+                f"Allowed values: {OVERFLOW_POLICIES}"
+            )
+
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval_seconds
+        self.max_buffer = max_buffer
+        self.overflow_policy = overflow_policy
+
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._flush_requested: Optional[asyncio.Event] = None
+        self._space_available: Optional[asyncio.Condition] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self._counters = {"logged": 0, "written": 0, "dropped": 0, "flushes": 0}
+        self._flush_stats = LatencyStats()
+
+    async def start(self):
+        """Starts the background flush task."""
+        if self._flusher is not None:
+            return
+        self._stopping = False
+        self._flush_requested = asyncio.Event()
+        self._space_available = asyncio.Condition()
+        self._flusher = asyncio.create_task(self._run(), name="interaction-logger")
+
+    async def stop(self):
+        """Stops the flush task and writes whatever is still buffered."""
+        if self._flusher is not None:
+            self._stopping = True
+            self._flush_requested.set()
+            await self._flusher
+            self._flusher = None
+        await self.flush()
+        logging.info("Interaction logger stopped")
+
+    async def log(
+        self, question: str, response: str, sender_id: Optional[str] = None
+    ) -> bool:
+        """
+        Buffers an interaction for the next bulk write.
+
+        Args:
+            question (str): User's input question.
+            response (str): LLM's generated response.
+            sender_id (str, optional): WhatsApp ID of the user who asked.
+
+        Returns:
+            bool: False if the row was dropped because the buffer is full.
+        """
+        await self.start()
+
+        if len(self._buffer) >= self.max_buffer:
+            if self.overflow_policy == "drop_newest":
+                self._counters["dropped"] += 1
+                return False
+            if self.overflow_policy == "drop_oldest":
+                self._buffer.popleft()
+                self._counters["dropped"] += 1
+            else:
+                self._flush_requested.set()
+                async with self._space_available:
+                    await self._space_available.wait_for(
+                        lambda: len(self._buffer) < self.max_buffer
+                    )
+
+        self._buffer.append(
+            {
+                "id": uuid.uuid4(),
+                "sender_id": sender_id,
+                "question": question,
+                "response": response,
+                "interaction_time": datetime.now(),
+            }
+        )
+        self._counters["logged"] += 1
+
+        if len(self._buffer) >= self.flush_size:
+            self._flush_requested.set()
+        return True
+
+    async def flush(self) -> int:
+        """
+        Writes every buffered row in one multi-row INSERT.
+
+        Returns:
+            int: The number of rows written.
+        """
+        if not self._buffer:
+            return 0
+
+        rows = list(self._buffer)
+        self._buffer.clear()
+
+        start = time.perf_counter()
+        try:
+            written = await asyncio.to_thread(save_interactions_to_db, rows)
+        except Exception as error:
+            logging.error(f"Error flushing interactions: {error}", exc_info=True)
+            self._requeue(rows)
+            return 0
+        finally:
+            await self._notify_space()
+
+        self._flush_stats.observe(time.perf_counter() - start)
+        self._counters["written"] += written
+        self._counters["flushes"] += 1
+        return written
+
+    def stats(self) -> Dict[str, Any]:
+        """Return buffer depth, write counters and flush latency."""
+        return {
+            "buffered": len(self._buffer),
+            "capacity": self.max_buffer,
+            **self._counters,
+            "flush": self._flush_stats.snapshot(),
+        }
+
+    def _requeue(self, rows):
+        # Put failed rows back in front of newer ones, within the buffer bound
+        room = max(0, self.max_buffer - len(self._buffer))
+        kept = rows[-room:] if room else []
+        self._counters["dropped"] += len(rows) - len(kept)
+        self._buffer.extendleft(reversed(kept))
+
+    async def _notify_space(self):
+        if self._space_available is not None:
+            async with self._space_available:
+                self._space_available.notify_all()
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(
+                    self._flush_requested.wait(), timeout=self.flush_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            await self.flush()
+
+
+_interaction_logger = None
+
+
+def get_interaction_logger() -> InteractionLogger:
+    """Return the process-wide interaction logger."""
+    global _interaction_logger
+
+    if _interaction_logger is None:
+        logger_config = settings.interaction_logger
+        _interaction_logger = InteractionLogger(
+            flush_size=logger_config.flush_size,
+            flush_interval_seconds=logger_config.flush_interval_seconds,
+            max_buffer=logger_config.max_buffer,
+            overflow_policy=logger_config.overflow_policy,
+        )
+    return _interaction_logger
@@ -0,0 +1,271 @@
+import asyncio
+import glob
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+from src.config import settings
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class CompletionCache:
+    """
+    Content-addressed cache for structured LLM completions.
+
+    Entries are keyed on a SHA-256 of the model name, the messages and the JSON
+    schema of the ``response_format``, and hold the parsed Pydantic result. A
+    bounded in-memory LRU tier sits in front of an optional on-disk tier, both
+    honouring ``ttl_seconds``. Only the stages listed in ``enabled_stages`` are
+    cached; other stages always reach the API. Only ``disk_stages`` are written
+    to disk, where expired and surplus files are pruned periodically on write.
+    """
+
+    # Disk writes between two scans that prune the directory
+    PRUNE_EVERY = 100
+
+    def __init__(
+        self,
+        enabled_stages: Iterable[str] = (),
+        max_entries: int = 1000,
+        ttl_seconds: float = 3600,
+        disk_dir: Optional[str] = None,
+        disk_stages: Iterable[str] = (),
+        max_disk_entries: int = 10000,
+    ):
+        self.enabled_stages = set(enabled_stages)
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.disk_dir = disk_dir
+        self.disk_stages = set(disk_stages)
+        self.max_disk_entries = max_disk_entries
+
+        self._disk_writes = 0
+
+        self._memory: "OrderedDict[str, Tuple[float, BaseModel]]" = OrderedDict()
+        self._schemas: Dict[Type[BaseModel], Dict[str, Any]] = {}
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        )
+
+    async def parse(
+        self,
+        client: Any,
+        stage: str,
+        model: str,
+        messages: List[Dict[str, Any]],
+        response_format: Type[ModelT],
+    ) -> ModelT:
+        """
+        Returns the parsed completion for these inputs, calling the API only on
+        a cache miss.
+
+        Args:
+            client (Any): Async OpenAI client.
+            stage (str): Pipeline stage name, used for opt-in and counters.
+            model (str): The model name.
+            messages (list): Chat messages sent to the model.
+            response_format (Type[BaseModel]): Pydantic model for structured output.
+
+        Returns:
+            BaseModel: The parsed response.
+        """
+        if stage not in self.enabled_stages:
+            completion = await client.beta.chat.completions.parse(
+                model=model, messages=messages, response_format=response_format
+            )
+            return completion.choices[0].message.parsed
+
+        key = self.make_key(model, messages, response_format)
+        counters = self._counters[stage]
+
+        cached = self._get_memory(key)
+        if cached is not None:
+            counters["memory_hits"] += 1
+            return cached.model_copy(deep=True)
+
+        use_disk = bool(self.disk_dir) and stage in self.disk_stages
+        if use_disk:
+            entry = await asyncio.to_thread(self._get_disk, key, response_format)
+            if entry is not None:
+                created_at, cached = entry
+                counters["disk_hits"] += 1
+                self._set_memory(key, cached, created_at=created_at)
+                return cached.model_copy(deep=True)
+
+        counters["misses"] += 1
+        completion = await client.beta.chat.completions.parse(
+            model=model, messages=messages, response_format=response_format
+        )
+        result = completion.choices[0].message.parsed
+
+        self._set_memory(key, result.model_copy(deep=True))
+        if use_disk:
+            try:
+                await asyncio.to_thread(self._set_disk, key, result)
+            except OSError as error:
+                logging.warning(f"Could not write LLM cache entry: {error}")
+        return result
+
+    def make_key(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        response_format: Type[BaseModel],
+    ) -> str:
+        """
+        Builds the stable cache key for a structured completion.
+
+        Args:
+            model (str): The model name.
+            messages (list): Chat messages sent to the model.
+            response_format (Type[BaseModel]): Pydantic model for structured output.
+
+        Returns:
+            str: Hex SHA-256 digest.
+        """
+        schema = self._schemas.get(response_format)
+        if schema is None:
+            schema = self._schemas[response_format] = (
+                response_format.model_json_schema()
+            )
+
+        payload = json.dumps(
+            {"model": model, "messages": messages, "schema": schema},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def clear(self):
+        """Drops the in-memory tier."""
+        self._memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit and miss counters per stage."""
+        stages = {}
+        for stage, counters in self._counters.items():
+            lookups = sum(counters.values())
+            hits = counters["memory_hits"] + counters["disk_hits"]
+            stages[stage] = {
+                **counters,
+                "hit_rate": hits / lookups if lookups else 0.0,
+            }
+        return {"entries": len(self._memory), "stages": stages}
+
+    def _get_memory(self, key: str) -> Optional[BaseModel]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        created_at, value = entry
+        if time.time() - created_at > self.ttl:
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return value
+
+    def _set_memory(
+        self, key: str, value: BaseModel, created_at: Optional[float] = None
+    ):
+        self._memory[key] = (created_at or time.time(), value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _get_disk(
+        self, key: str, response_format: Type[ModelT]
+    ) -> Optional[Tuple[float, ModelT]]:
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            created_at = float(entry["created_at"])
+            if time.time() - created_at > self.ttl:
+                _remove_quietly(path)
+                return None
+            return created_at, response_format.model_validate(entry["value"])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            # Malformed or half-deleted entries are a miss, never a failed request
+            logging.warning(f"Ignoring unreadable LLM cache entry {path}: {error}")
+            return None
+
+    def _set_disk(self, key: str, value: BaseModel):
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file first so readers never see a partial entry
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "created_at": time.time(),
+                    "schema": type(value).__name__,
+                    "value": value.model_dump(mode="json"),
+                },
+                f,
+            )
+        os.replace(temporary_path, path)
+
+        self._disk_writes += 1
+        if self._disk_writes % self.PRUNE_EVERY == 0:
+            self._prune_disk()
+
+    def _prune_disk(self):
+        """Deletes expired entries, then the oldest ones beyond ``max_disk_entries``."""
+        entries = []
+        for path in glob.glob(os.path.join(self.disk_dir, "*", "*.json")):
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                continue
+
+        expires_before = time.time() - self.ttl
+        entries.sort()
+        surplus = len(entries) - self.max_disk_entries
+        removed = 0
+        for index, (modified_at, path) in enumerate(entries):
+            if modified_at >= expires_before and index >= surplus:
+                break
+            _remove_quietly(path)
+            removed += 1
+        if removed:
+            logging.info(f"Pruned {removed} LLM cache entries from {self.disk_dir}")
+
+
+def _remove_quietly(path: str):
+    """Removes a file another worker may already have removed."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+_completion_cache = None
+
+
+def get_completion_cache() -> CompletionCache:
+    """Return the process-wide structured completion cache."""
+    global _completion_cache
+
+    if _completion_cache is None:
+        cache_config = settings.llm_cache
+        _completion_cache = CompletionCache(
+            enabled_stages=cache_config.enabled_stages,
+            max_entries=cache_config.max_entries,
+            ttl_seconds=cache_config.ttl_seconds,
+            disk_dir=cache_config.disk_dir,
+            disk_stages=cache_config.disk_stages,
+            max_disk_entries=cache_config.max_disk_entries,
+        )
+    return _completion_cache
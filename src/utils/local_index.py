@@ -0,0 +1,213 @@
+import json
+import logging
+import mmap
+import os
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.config import settings
+
+if TYPE_CHECKING:
+    from qdrant_client import models
+
+
+def _collection_paths(index_dir: str, collection_name: str) -> Dict[str, str]:
+    base = os.path.join(index_dir, collection_name)
+    return {
+        "vectors": f"{base}.npy",
+        "payloads": f"{base}.payloads.jsonl",
+        "offsets": f"{base}.offsets.npy",
+    }
+
+
+def _replace_atomically(path: str, write):
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as f:
+        write(f)
+    os.replace(temporary_path, path)
+
+
+def write_local_collection(
+    index_dir: str,
+    collection_name: str,
+    vectors: np.ndarray,
+    payloads: Sequence[Dict[str, Any]],
+):
+    """
+    Writes one collection of the local index.
+
+    The collection is stored as three files: a float32 ``.npy`` matrix of
+    L2-normalized vectors, a JSON Lines file with one payload per row, and an
+    ``.offsets.npy`` array of the byte offset where each payload starts. The
+    matrix is replaced last, so readers reload once all files are in place.
+
+    Args:
+        index_dir (str): Directory of the local index.
+        collection_name (str): Name of the collection.
+        vectors (np.ndarray): One embedding per payload.
+        payloads (Sequence[dict]): Point payloads, in row order.
+    """
+    os.makedirs(index_dir, exist_ok=True)
+    paths = _collection_paths(index_dir, collection_name)
+
+    matrix = np.asarray(vectors, dtype=np.float32).reshape(len(payloads), -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix = matrix / norms
+
+    lines = [
+        json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n"
+        for payload in payloads
+    ]
+    offsets = np.cumsum([0] + [len(line) for line in lines], dtype=np.int64)
+
+    _replace_atomically(paths["payloads"], lambda f: f.writelines(lines))
+    _replace_atomically(paths["offsets"], lambda f: np.save(f, offsets))
+    _replace_atomically(paths["vectors"], lambda f: np.save(f, matrix))
+
+
+def read_local_collection(
+    index_dir: str, collection_name: str
+) -> Optional[Tuple[np.ndarray, List[Dict[str, Any]]]]:
+    """
+    Reads a whole collection back, e.g. to reuse unchanged vectors on re-ingestion.
+
+    Args:
+        index_dir (str): Directory of the local index.
+        collection_name (str): Name of the collection.
+
+    Returns:
+        tuple or None: (vectors, payloads), or None if the collection does not exist.
+    """
+    paths = _collection_paths(index_dir, collection_name)
+    if not os.path.exists(paths["vectors"]):
+        return None
+
+    vectors = np.load(paths["vectors"])
+    with open(paths["payloads"], "r", encoding="utf-8") as f:
+        payloads = [json.loads(line) for line in f if line.strip()]
+    return vectors, payloads
+
+
+class _LoadedCollection:
+    def __init__(self, paths: Dict[str, str]):
+        self.version = os.stat(paths["vectors"]).st_mtime_ns
+        self.vectors = np.load(paths["vectors"], mmap_mode="r")
+        self.offsets = np.load(paths["offsets"])
+        with open(paths["payloads"], "rb") as f:
+            self.payloads = (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                if self.offsets[-1]
+                else b""
+            )
+
+    def payload(self, row: int) -> Dict[str, Any]:
+        return json.loads(self.payloads[self.offsets[row] : self.offsets[row + 1]])
+
+
+class LocalVectorIndex:
+    """
+    In-process, read-only vector index for small knowledge bases.
+
+    Each collection is a memory-mapped matrix of normalized embeddings, so a
+    top-k query is one matrix-vector product; only the payloads of the hits
+    are decoded. Collections are loaded on first use and reloaded when
+    ingestion rewrites them.
+    """
+
+    def __init__(self, index_dir: str):
+        self.index_dir = index_dir
+        self._collections: Dict[str, _LoadedCollection] = {}
+        self._lock = threading.Lock()
+
+    def search(
+        self, collection_name: str, query_vector: Sequence[float], limit: int = 3
+    ) -> List["models.ScoredPoint"]:
+        """
+        Returns the most similar points of a collection by cosine similarity.
+
+        Args:
+            collection_name (str): Name of the collection.
+            query_vector (Sequence[float]): The query embedding.
+            limit (int): The maximum number of results.
+
+        Returns:
+            list[ScoredPoint]: Hits in descending score order, shaped like
+            Qdrant search results.
+        """
+        collection = self._collection(collection_name)
+        if collection is None or not len(collection.vectors) or limit <= 0:
+            return []
+
+        query = np.asarray(query_vector, dtype=np.float32)
+        scores = collection.vectors @ (query / (np.linalg.norm(query) or 1.0))
+
+        limit = min(limit, len(scores))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+
+        from qdrant_client import models
+
+        hits = []
+        for row in top:
+            payload = collection.payload(int(row))
+            hits.append(
+                models.ScoredPoint(
+                    id=payload.get("id", int(row)),
+                    version=0,
+                    score=float(scores[row]),
+                    payload=payload,
+                )
+            )
+        return hits
+
+    def preload(self, collection_names: Sequence[str]) -> List[str]:
+        """
+        Loads collections ahead of the first search.
+
+        Args:
+            collection_names (Sequence[str]): Names of the collections.
+
+        Returns:
+            list[str]: The names of the collections that do not exist.
+        """
+        return [name for name in collection_names if self._collection(name) is None]
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of vectors held per loaded collection."""
+        return {
+            name: len(collection.vectors)
+            for name, collection in self._collections.items()
+        }
+
+    def _collection(self, collection_name: str) -> Optional[_LoadedCollection]:
+        paths = _collection_paths(self.index_dir, collection_name)
+        try:
+            version = os.stat(paths["vectors"]).st_mtime_ns
+        except FileNotFoundError:
+            logging.warning(f"Local index has no collection '{collection_name}'")
+            return None
+
+        collection = self._collections.get(collection_name)
+        if collection is None or collection.version != version:
+            with self._lock:
+                collection = self._collections.get(collection_name)
+                if collection is None or collection.version != version:
+                    logging.info(f"Loading local index collection '{collection_name}'")
+                    collection = _LoadedCollection(paths)
+                    self._collections[collection_name] = collection
+        return collection
+
+
+_local_index = None
+
+
+def get_local_index() -> LocalVectorIndex:
+    """Return the process-wide local vector index."""
+    global _local_index
+
+    if _local_index is None:
+        _local_index = LocalVectorIndex(settings.retrieval.local_index_dir)
+    return _local_index
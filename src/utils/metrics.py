@@ -0,0 +1,254 @@
+import bisect
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+
+class LatencyStats:
+    """Thread-safe running count, total and max of observed durations (seconds)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def observe(self, seconds: float):
+        """Record a single duration."""
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.last = seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def snapshot(self) -> Dict[str, float]:
+        """Return a point-in-time copy of the statistics."""
+        with self._lock:
+            return {
+                "count": self.count,
+                "total_seconds": self.total,
+                "avg_seconds": self.total / self.count if self.count else 0.0,
+                "max_seconds": self.max,
+                "last_seconds": self.last,
+            }
+
+
+# Seconds; spans a cached lookup (sub-millisecond) up to a slow LLM call
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+class Histogram:
+    """
+    Thread-safe, labelled latency histogram in the Prometheus model.
+
+    An observation is a bisect into the bucket bounds plus a few additions
+    under a lock, so timing a call costs about a microsecond.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+
+        self._lock = threading.Lock()
+        # Label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, **labels: str):
+        """Record one observation for the given label values."""
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[Dict[str, str]]:
+        """
+        Times the enclosed block.
+
+        The yielded dict holds the labels and may be updated inside the block,
+        e.g. to set the intent once it is known. ``outcome`` defaults to "ok",
+        or "error" when the block raises.
+        """
+        labels.setdefault("outcome", "ok")
+        start = time.perf_counter()
+        try:
+            yield labels
+        except BaseException:
+            labels["outcome"] = "error"
+            raise
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def timed(self, **labels: str) -> Callable:
+        """Decorator that times every call of a sync or async function."""
+
+        def decorator(function: Callable) -> Callable:
+            if inspect.iscoroutinefunction(function):
+
+                @functools.wraps(function)
+                async def async_wrapper(*args, **kwargs):
+                    with self.time(**labels):
+                        return await function(*args, **kwargs)
+
+                return async_wrapper
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.time(**labels):
+                    return function(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def render(self) -> List[str]:
+        """Return the histogram in the Prometheus text exposition format."""
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = [
+                (key, list(counts), total, count)
+                for key, (counts, total, count) in self._series.items()
+            ]
+
+        for key, counts, total, count in sorted(series):
+            labels = list(zip(self.label_names, key))
+            cumulative = 0
+            for bound, bucket_count in zip(
+                [*map(_format_bound, self.buckets), "+Inf"], counts
+            ):
+                cumulative += bucket_count
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(labels + [('le', bound)])} "
+                    f"{cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound))
+
+
+def _format_labels(labels: Sequence[Tuple[str, Any]]) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels:
+        value = (
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _flatten(stats: Dict[str, Any], prefix: str = "") -> Iterator[Tuple[str, float]]:
+    for key, value in stats.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{name}_")
+        elif isinstance(value, (bool, int, float)):
+            yield name, float(value)
+
+
+def render_stats_gauges(
+    name: str, description: str, components: Dict[str, Dict[str, Any]]
+) -> List[str]:
+    """
+    Renders existing ``stats()`` dictionaries as one labelled gauge family.
+
+    Nested keys are joined with underscores and non-numeric values skipped, e.g.
+    ``{"tracking_cache": {"hit_rate": 0.8}}`` becomes
+    ``name{component="tracking_cache",stat="hit_rate"} 0.8``.
+
+    Args:
+        name (str): Metric name.
+        description (str): Help text.
+        components (dict): Stats dictionaries keyed by component name.
+
+    Returns:
+        list[str]: Lines in the Prometheus text exposition format.
+    """
+    lines = [f"# HELP {name} {description}", f"# TYPE {name} gauge"]
+    for component, stats in components.items():
+        for stat, value in _flatten(stats):
+            labels = _format_labels([("component", component), ("stat", stat)])
+            lines.append(f"{name}{labels} {value}")
+    return lines
+
+
+# Process-wide histograms
+request_stage_seconds = Histogram(
+    "request_stage_seconds",
+    "Time spent in each stage of answering a message.",
+    ("stage", "intent", "outcome"),
+)
+db_query_seconds = Histogram(
+    "db_query_seconds",
+    "Time spent in each database helper, including waiting for a connection.",
+    ("helper", "outcome"),
+)
+embedding_encode_seconds = Histogram(
+    "embedding_encode_seconds",
+    "Time spent in one batched forward pass of the embedding model.",
+    ("backend", "outcome"),
+)
+vector_search_seconds = Histogram(
+    "vector_search_seconds",
+    "Time spent in one vector search.",
+    ("backend", "collection", "outcome"),
+)
+whatsapp_send_seconds = Histogram(
+    "whatsapp_send_seconds",
+    "Time spent sending one reply through the WhatsApp Cloud API.",
+    ("outcome",),
+)
+
+HISTOGRAMS = (
+    request_stage_seconds,
+    db_query_seconds,
+    embedding_encode_seconds,
+    vector_search_seconds,
+    whatsapp_send_seconds,
+)
+
+
+def render_histograms() -> str:
+    """Return every process-wide histogram in the Prometheus text format."""
+    return "\n".join(line for histogram in HISTOGRAMS for line in histogram.render())
@@ -0,0 +1,23 @@
+import argparse
+import logging
+
+from src.config import settings
+from src.utils.custom_logging import setup_logging
+from src.utils.db import ensure_interactions_schema
+from src.utils.tracking_cache import install_tracking_notify_trigger
+
+
+def main():
+    """CLI that applies the schema changes the app expects to an existing database."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.parse_args()
+    setup_logging()
+
+    ensure_interactions_schema()
+    if settings.tracking_cache.listen:
+        install_tracking_notify_trigger(settings.tracking_cache.channel)
+    logging.info("Database schema is up to date.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+)
+
+import numpy as np
+
+from src.config import settings
+from src.utils.db import get_async_qdrant_client, get_qdrant_client
+
+if TYPE_CHECKING:
+    from qdrant_client import QdrantClient
+
+VersionReader = Callable[[], Awaitable[Optional[str]]]
+
+# The single point of the version collection that holds the version
+KNOWLEDGE_BASE_VERSION_POINT_ID = 1
+# File holding the version next to the local index's collections
+LOCAL_VERSION_FILE = "VERSION"
+
+
+class SemanticCache:
+    """
+    Answer cache keyed by question embeddings.
+
+    A lookup returns the cached value of the most similar stored question when
+    its cosine similarity reaches ``similarity_threshold``. Entries expire after
+    ``ttl_seconds`` and the least recently used entry is evicted once
+    ``max_entries`` are held. The whole cache is dropped when ``invalidate`` is
+    called or when ``check_version`` finds that the knowledge base, read with
+    ``version_reader``, was re-ingested; the version is read at most every
+    ``version_check_seconds``.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.92,
+        max_entries: int = 1000,
+        ttl_seconds: float = 86400,
+        version_reader: Optional[VersionReader] = None,
+        version_check_seconds: float = 30.0,
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.version_reader = version_reader
+        self.version_check_seconds = version_check_seconds
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: List[str] = []
+        self._version: Optional[str] = None
+        self._version_checked_at: Optional[float] = None
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def lookup(self, embedding: Sequence[float]) -> Optional[Any]:
+        """
+        Returns the cached value for the closest stored question, if it is
+        similar enough and still fresh.
+
+        Args:
+            embedding (Sequence[float]): Embedding of the incoming question.
+
+        Returns:
+            Any or None: The cached value, or None on a miss.
+        """
+        if not self._entries:
+            self._counters["misses"] += 1
+            return None
+
+        if self._matrix is None:
+            self._matrix = np.stack(
+                [entry["embedding"] for entry in self._entries.values()]
+            )
+            self._matrix_keys = list(self._entries.keys())
+
+        similarities = self._matrix @ self._normalize(embedding)
+        best = int(np.argmax(similarities))
+        key = self._matrix_keys[best]
+        entry = self._entries.get(key)
+
+        if entry is None or similarities[best] < self.similarity_threshold:
+            self._counters["misses"] += 1
+            return None
+
+        if time.monotonic() - entry["created_at"] > self.ttl:
+            self._remove(key)
+            self._counters["misses"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._counters["hits"] += 1
+        logging.info(
+            f"Semantic cache hit (similarity {similarities[best]:.3f}) for: {key}"
+        )
+        return entry["value"]
+
+    def store(self, question: str, embedding: Sequence[float], value: Any):
+        """
+        Caches a value under a question and its embedding.
+
+        Args:
+            question (str): The question text, used as the entry key.
+            embedding (Sequence[float]): Embedding of the question.
+            value (Any): The answer to return on later hits.
+        """
+        key = question.strip().lower()
+        self._entries.pop(key, None)
+        self._entries[key] = {
+            "embedding": self._normalize(embedding),
+            "value": value,
+            "created_at": time.monotonic(),
+        }
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+        self._matrix = None
+
+    async def check_version(self):
+        """
+        Drops every cached answer if the knowledge base was re-ingested since
+        the last check. Call it before ``lookup``; it only reads the version
+        once ``version_check_seconds`` have passed.
+        """
+        if self.version_reader is None:
+            return
+        now = time.monotonic()
+        if (
+            self._version_checked_at is not None
+            and now - self._version_checked_at < self.version_check_seconds
+        ):
+            return
+        self._version_checked_at = now
+
+        try:
+            version = await self.version_reader()
+        except Exception as error:
+            logging.warning(f"Could not read the knowledge-base version: {error}")
+            return
+        if version != self._version:
+            if self._version is not None or self._entries:
+                self.invalidate()
+            self._version = version
+
+    def invalidate(self):
+        """Drops every cached answer, e.g. after the knowledge base is re-ingested."""
+        self._entries.clear()
+        self._matrix = None
+        self._counters["invalidations"] += 1
+        logging.info("Semantic cache invalidated")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return entry count and hit-rate counters."""
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {
+            "entries": len(self._entries),
+            "capacity": self.max_entries,
+            "knowledge_base_version": self._version,
+            **self._counters,
+            "hit_rate": self._counters["hits"] / lookups if lookups else 0.0,
+        }
+
+    def _remove(self, key: str):
+        self._entries.pop(key, None)
+        self._matrix = None
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+def _local_version_path() -> str:
+    return os.path.join(settings.retrieval.local_index_dir, LOCAL_VERSION_FILE)
+
+
+def _read_local_version() -> Optional[str]:
+    try:
+        with open(_local_version_path(), "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+async def read_knowledge_base_version() -> Optional[str]:
+    """
+    Reads the knowledge-base version recorded by the last ingestion, from the
+    store every worker searches: the ``semantic_cache.version_collection``
+    Qdrant collection, or a file in the local index directory.
+
+    Returns:
+        str or None: The version, or None before the first ingestion.
+    """
+    if settings.retrieval.backend == "local":
+        return await asyncio.to_thread(_read_local_version)
+
+    client = get_async_qdrant_client()
+    collection_name = settings.semantic_cache.version_collection
+    if not await client.collection_exists(collection_name):
+        return None
+    points = await client.retrieve(
+        collection_name, ids=[KNOWLEDGE_BASE_VERSION_POINT_ID], with_payload=True
+    )
+    return points[0].payload.get("version") if points else None
+
+
+def mark_knowledge_base_updated(client: Optional["QdrantClient"] = None):
+    """
+    Records a new knowledge-base version next to the ingested collections, so
+    every running semantic cache drops its answers on its next version check.
+
+    Args:
+        client (QdrantClient, optional): Defaults to the shared Qdrant client.
+    """
+    version = uuid.uuid4().hex
+
+    if settings.retrieval.backend == "local":
+        path = _local_version_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(temporary_path, path)
+    else:
+        from qdrant_client import models
+
+        client = client or get_qdrant_client()
+        collection_name = settings.semantic_cache.version_collection
+        if not client.collection_exists(collection_name):
+            client.create_collection(
+                collection_name=collection_name,
+                vectors_config=models.VectorParams(
+                    size=1, distance=models.Distance.DOT
+                ),
+            )
+        client.upsert(
+            collection_name=collection_name,
+            points=[
+                models.PointStruct(
+                    id=KNOWLEDGE_BASE_VERSION_POINT_ID,
+                    vector=[1.0],
+                    payload={"version": version, "updated_at": time.time()},
+                )
+            ],
+        )
+    logging.info(f"Knowledge-base version is now {version}")
+
+
+_semantic_cache = None
+
+
+def get_semantic_cache() -> SemanticCache:
+    """Return the process-wide semantic cache for policy answers."""
+    global _semantic_cache
+
+    if _semantic_cache is None:
+        cache_config = settings.semantic_cache
+        _semantic_cache = SemanticCache(
+            similarity_threshold=cache_config.similarity_threshold,
+            max_entries=cache_config.max_entries,
+            ttl_seconds=cache_config.ttl_seconds,
+            version_reader=read_knowledge_base_version,
+            version_check_seconds=cache_config.version_check_seconds,
+        )
+    return _semantic_cache
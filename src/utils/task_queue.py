@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import random
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.config import settings
+from src.utils.metrics import LatencyStats
+
+JobHandler = Callable[[Any], Awaitable[None]]
+FailureHandler = Callable[[Any], None]
+
+
+def retry_delay(attempt: int, base_seconds: float, max_seconds: float) -> float:
+    """
+    Exponential backoff with jitter before the given retry attempt.
+
+    Args:
+        attempt (int): The retry number, starting at 1.
+        base_seconds (float): Delay before the first retry.
+        max_seconds (float): Upper bound of the delay.
+
+    Returns:
+        float: Seconds to wait.
+    """
+    delay = min(max_seconds, base_seconds * 2 ** (attempt - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class TaskQueue(ABC):
+    """Interface for the queue that runs webhook jobs off the request path."""
+
+    @abstractmethod
+    async def start(self):
+        """Starts consuming jobs."""
+
+    @abstractmethod
+    async def stop(self):
+        """Stops consuming jobs, draining what is already queued where possible."""
+
+    @abstractmethod
+    def enqueue(self, job: Any) -> bool:
+        """Queues a job. Returns False if the job was rejected."""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Returns queue depth and throughput counters."""
+
+
+class InProcessTaskQueue(TaskQueue):
+    """
+    Bounded asyncio queue consumed by a fixed pool of worker tasks.
+
+    Failed jobs are retried with exponential backoff and jitter. A job waiting
+    for its retry does not hold a worker. A job that still fails after
+    ``max_retries`` retries is logged, passed to ``on_failure`` and dropped.
+    """
+
+    def __init__(
+        self,
+        handler: JobHandler,
+        concurrency: int = 4,
+        max_size: int = 1000,
+        max_retries: int = 3,
+        backoff_base_seconds: float = 1.0,
+        backoff_max_seconds: float = 30.0,
+        drain_timeout_seconds: float = 10.0,
+        on_failure: Optional[FailureHandler] = None,
+    ):
+        self.handler = handler
+        self.on_failure = on_failure
+        self.concurrency = concurrency
+        self.max_size = max_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base_seconds
+        self.backoff_max = backoff_max_seconds
+        self.drain_timeout = drain_timeout_seconds
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._retry_handles: List[asyncio.TimerHandle] = []
+        self._accepting = False
+
+        self._in_flight = 0
+        self._max_depth = 0
+        self._counters = {
+            "enqueued": 0,
+            "rejected": 0,
+            "processed": 0,
+            "retried": 0,
+            "failed": 0,
+        }
+        self._latency = LatencyStats()
+
+    async def start(self):
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._accepting = True
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"message-worker-{index}")
+            for index in range(self.concurrency)
+        ]
+        logging.info(f"Started {self.concurrency} message queue workers")
+
+    async def stop(self):
+        self._accepting = False
+        for handle in self._retry_handles:
+            handle.cancel()
+        self._retry_handles.clear()
+
+        if self._queue is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=self.drain_timeout)
+            except asyncio.TimeoutError:
+                logging.warning(
+                    f"Message queue not drained after {self.drain_timeout}s, "
+                    f"dropping {self._queue.qsize()} jobs"
+                )
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        logging.info("Message queue workers stopped")
+
+    def enqueue(self, job: Any) -> bool:
+        if not self._accepting or not self._put(job, attempt=0, queued_at=None):
+            self._counters["rejected"] += 1
+            return False
+        self._counters["enqueued"] += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_depth": self._max_depth,
+            "capacity": self.max_size,
+            "in_flight": self._in_flight,
+            "pending_retries": len(self._retry_handles),
+            **self._counters,
+            "job_latency": self._latency.snapshot(),
+        }
+
+    def _put(self, job: Any, attempt: int, queued_at: Optional[float]) -> bool:
+        try:
+            self._queue.put_nowait((job, attempt, queued_at or time.perf_counter()))
+        except asyncio.QueueFull:
+            return False
+        self._max_depth = max(self._max_depth, self._queue.qsize())
+        return True
+
+    def _schedule_retry(self, job: Any, attempt: int, queued_at: float):
+        delay = retry_delay(attempt, self.backoff_base, self.backoff_max)
+
+        def _requeue():
+            self._retry_handles.remove(handle)
+            if not self._put(job, attempt, queued_at):
+                logging.error(f"Message queue full, dropping retry of job: {job}")
+                self._fail(job)
+
+        handle = asyncio.get_running_loop().call_later(delay, _requeue)
+        self._retry_handles.append(handle)
+        self._counters["retried"] += 1
+        logging.info(f"Retrying job in {delay:.2f}s (attempt {attempt})")
+
+    async def _worker(self):
+        while True:
+            job, attempt, queued_at = await self._queue.get()
+            self._in_flight += 1
+            try:
+                await self.handler(job)
+                self._counters["processed"] += 1
+                self._latency.observe(time.perf_counter() - queued_at)
+            except Exception as error:
+                logging.error(f"Job failed (attempt {attempt}): {error}", exc_info=True)
+                if attempt < self.max_retries and self._accepting:
+                    self._schedule_retry(job, attempt + 1, queued_at)
+                else:
+                    self._fail(job)
+            finally:
+                self._in_flight -= 1
+                self._queue.task_done()
+
+    def _fail(self, job: Any):
+        self._counters["failed"] += 1
+        if self.on_failure is not None:
+            try:
+                self.on_failure(job)
+            except Exception as error:
+                logging.error(f"Failure handler raised: {error}", exc_info=True)
+
+
+def create_task_queue(
+    handler: JobHandler, on_failure: Optional[FailureHandler] = None
+) -> TaskQueue:
+    """
+    Builds the task queue selected by the ``message_queue`` settings.
+
+    Args:
+        handler (Callable): Coroutine function run for every job.
+        on_failure (Callable, optional): Called with each job dropped after its
+            last retry.
+
+    Returns:
+        TaskQueue: An unstarted queue.
+    """
+    queue_config = settings.message_queue
+
+    if queue_config.backend == "in_process":
+        return InProcessTaskQueue(
+            handler,
+            concurrency=queue_config.concurrency,
+            max_size=queue_config.max_size,
+            max_retries=queue_config.max_retries,
+            backoff_base_seconds=queue_config.backoff_base_seconds,
+            backoff_max_seconds=queue_config.backoff_max_seconds,
+            drain_timeout_seconds=queue_config.drain_timeout_seconds,
+            on_failure=on_failure,
+        )
+
+    raise ValueError(f"Unsupported message queue backend: {queue_config.backend}")
@@ -0,0 +1,351 @@
+import asyncio
+import logging
+import select
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+
+from src.config import settings
+from src.utils.db import get_engine, get_latest_tracking_infos, session_scope
+from src.utils.metrics import LatencyStats
+
+TrackingInfo = Optional[Dict[str, Any]]
+
+
+class TrackingCache:
+    """
+    Bounded read-through cache of the latest tracking info per tracking code.
+    Misses are loaded together with one bulk query.
+
+    Known codes are kept for ``ttl_seconds`` and unknown codes (a None result)
+    for ``negative_ttl_seconds``; the least recently used code is evicted once
+    ``max_entries`` are held. Entries can also be invalidated explicitly, e.g.
+    by ``TrackingChangeListener`` when the row changes in Postgres. Rows loaded
+    while an invalidation arrives are returned but not cached, since they may
+    predate the change.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 60,
+        negative_ttl_seconds: float = 10,
+        max_entries: int = 10000,
+        loader: Callable[
+            [Sequence[str]], Dict[str, Dict[str, Any]]
+        ] = get_latest_tracking_infos,
+    ):
+        self.ttl = ttl_seconds
+        self.negative_ttl = negative_ttl_seconds
+        self.max_entries = max_entries
+        self.loader = loader
+
+        self._entries: "OrderedDict[str, Tuple[float, TrackingInfo]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, so loads that overlap one are not stored
+        self._generation = 0
+        self._counters = {
+            "hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "discarded_loads": 0,
+        }
+        # Age of the entries served from the cache
+        self._staleness = LatencyStats()
+
+    def get(self, tracking_code: str) -> TrackingInfo:
+        """
+        Returns the tracking info for a code, querying the database on a miss.
+
+        Args:
+            tracking_code (str): The package tracking code.
+
+        Returns:
+            dict or None: Same as ``get_latest_tracking_info``.
+        """
+        return self.get_many([tracking_code])[tracking_code.upper()]
+
+    async def aget(self, tracking_code: str) -> TrackingInfo:
+        """
+        Async variant of ``get``; only cache misses leave the event loop, to run
+        the database query in a worker thread.
+
+        Args:
+            tracking_code (str): The package tracking code.
+
+        Returns:
+            dict or None: Same as ``get_latest_tracking_info``.
+        """
+        return (await self.aget_many([tracking_code]))[tracking_code.upper()]
+
+    def get_many(self, tracking_codes: Sequence[str]) -> Dict[str, TrackingInfo]:
+        """
+        Returns the tracking info for several codes, loading every miss with a
+        single bulk query.
+
+        Args:
+            tracking_codes (Sequence[str]): The package tracking codes.
+
+        Returns:
+            dict: Tracking info (None for unknown codes) keyed by upper-cased code.
+        """
+        found, missing = self._lookup_many(tracking_codes)
+        if missing:
+            found.update(self._load(missing))
+        return found
+
+    async def aget_many(self, tracking_codes: Sequence[str]) -> Dict[str, TrackingInfo]:
+        """
+        Async variant of ``get_many``.
+
+        Args:
+            tracking_codes (Sequence[str]): The package tracking codes.
+
+        Returns:
+            dict: Tracking info (None for unknown codes) keyed by upper-cased code.
+        """
+        found, missing = self._lookup_many(tracking_codes)
+        if missing:
+            found.update(await asyncio.to_thread(self._load, missing))
+        return found
+
+    def invalidate(self, tracking_code: Optional[str] = None):
+        """
+        Drops one tracking code, or every entry when no code is given.
+
+        Args:
+            tracking_code (str, optional): The code whose row changed.
+        """
+        with self._lock:
+            if tracking_code is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(tracking_code.upper(), None)
+            self._generation += 1
+            self._counters["invalidations"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit-rate counters and the age of the entries served."""
+        with self._lock:
+            counters = dict(self._counters)
+            entries = len(self._entries)
+        lookups = counters["hits"] + counters["negative_hits"] + counters["misses"]
+        hits = counters["hits"] + counters["negative_hits"]
+        return {
+            "entries": entries,
+            "capacity": self.max_entries,
+            **counters,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "staleness": self._staleness.snapshot(),
+        }
+
+    def _lookup_many(
+        self, tracking_codes: Sequence[str]
+    ) -> Tuple[Dict[str, TrackingInfo], List[str]]:
+        found: Dict[str, TrackingInfo] = {}
+        missing: List[str] = []
+        now = time.monotonic()
+        with self._lock:
+            for key in dict.fromkeys(code.upper() for code in tracking_codes):
+                entry = self._entries.get(key)
+                if entry is not None:
+                    fetched_at, value = entry
+                    age = now - fetched_at
+                    if age <= (self.ttl if value is not None else self.negative_ttl):
+                        self._entries.move_to_end(key)
+                        self._counters[
+                            "hits" if value is not None else "negative_hits"
+                        ] += 1
+                        self._staleness.observe(age)
+                        found[key] = value
+                        continue
+                    del self._entries[key]
+                self._counters["misses"] += 1
+                missing.append(key)
+        return found, missing
+
+    def _load(self, tracking_codes: List[str]) -> Dict[str, TrackingInfo]:
+        with self._lock:
+            generation = self._generation
+        rows = self.loader(tracking_codes)
+        loaded = {code: rows.get(code) for code in tracking_codes}
+        now = time.monotonic()
+        with self._lock:
+            if self._generation != generation:
+                # A change was announced during the query, which may have read
+                # the row before it
+                self._counters["discarded_loads"] += 1
+                return loaded
+            for code, value in loaded.items():
+                self._entries[code] = (now, value)
+                self._entries.move_to_end(code)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+        return loaded
+
+
+def install_tracking_notify_trigger(channel: str = "tracking_changes"):
+    """
+    Creates the trigger that announces every change to ``package_tracking`` on
+    a Postgres ``NOTIFY`` channel, with the tracking code as payload.
+
+    Args:
+        channel (str): The channel ``TrackingChangeListener`` listens on.
+    """
+    with session_scope() as session:
+        session.execute(
+            text(
+                f"""
+                CREATE OR REPLACE FUNCTION notify_tracking_change() RETURNS trigger AS $$
+                BEGIN
+                    PERFORM pg_notify(
+                        '{channel}',
+                        CASE WHEN TG_OP = 'DELETE' THEN OLD.tracking_code
+                             ELSE NEW.tracking_code END
+                    );
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql
+                """
+            )
+        )
+        session.execute(
+            text("DROP TRIGGER IF EXISTS tracking_change_notify ON package_tracking")
+        )
+        session.execute(
+            text(
+                """
+                CREATE TRIGGER tracking_change_notify
+                AFTER INSERT OR UPDATE OR DELETE ON package_tracking
+                FOR EACH ROW EXECUTE FUNCTION notify_tracking_change()
+                """
+            )
+        )
+        session.commit()
+    logging.info(f"Installed package_tracking NOTIFY trigger on channel '{channel}'")
+
+
+class TrackingChangeListener:
+    """
+    Background thread that invalidates tracking cache entries as Postgres
+    announces changes on a ``LISTEN/NOTIFY`` channel.
+
+    It holds one dedicated connection outside the pool. After a connection
+    error the whole cache is dropped, since notifications may have been
+    missed, and the listener reconnects.
+    """
+
+    def __init__(
+        self,
+        cache: TrackingCache,
+        channel: str = "tracking_changes",
+        reconnect_seconds: float = 5.0,
+    ):
+        self.cache = cache
+        self.channel = channel
+        self.reconnect_seconds = reconnect_seconds
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Starts listening in a daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="tracking-listener", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stops the listener thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        import psycopg2
+
+        url = get_engine().url
+        connect_args = url.translate_connect_args(username="user", database="dbname")
+
+        while not self._stop.is_set():
+            connection = None
+            try:
+                connection = psycopg2.connect(**connect_args, **url.query)
+                connection.autocommit = True
+                with connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                logging.info(f"Listening for tracking changes on '{self.channel}'")
+
+                while not self._stop.is_set():
+                    # Wake up periodically to notice stop()
+                    if select.select([connection], [], [], 1.0) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notify = connection.notifies.pop(0)
+                        self.cache.invalidate(notify.payload or None)
+
+            except Exception as error:
+                logging.error(f"Tracking change listener failed: {error}")
+                self.cache.invalidate()
+                self._stop.wait(self.reconnect_seconds)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+
+_tracking_cache = None
+_tracking_listener = None
+
+
+def get_tracking_cache() -> TrackingCache:
+    """Return the process-wide tracking info cache."""
+    global _tracking_cache
+
+    if _tracking_cache is None:
+        cache_config = settings.tracking_cache
+        _tracking_cache = TrackingCache(
+            ttl_seconds=cache_config.ttl_seconds,
+            negative_ttl_seconds=cache_config.negative_ttl_seconds,
+            max_entries=cache_config.max_entries,
+        )
+    return _tracking_cache
+
+
+def start_tracking_listener() -> Optional[TrackingChangeListener]:
+    """
+    Starts the change listener when ``tracking_cache.listen`` is enabled.
+
+    The NOTIFY trigger is installed by ``python -m src.utils.migrate``. Starting
+    never touches the database, and the listener keeps reconnecting until
+    Postgres is reachable, so the app also boots while Postgres is down.
+
+    Returns:
+        TrackingChangeListener or None: The running listener.
+    """
+    global _tracking_listener
+
+    cache_config = settings.tracking_cache
+    if not cache_config.listen:
+        return None
+
+    if _tracking_listener is None:
+        _tracking_listener = TrackingChangeListener(
+            get_tracking_cache(), channel=cache_config.channel
+        )
+    _tracking_listener.start()
+    return _tracking_listener
+
+
+def stop_tracking_listener():
+    """Stops the change listener, if it is running."""
+    if _tracking_listener is not None:
+        _tracking_listener.stop()
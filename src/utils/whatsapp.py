@@ -0,0 +1,242 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+from src.config import settings
+from src.utils.metrics import LatencyStats, whatsapp_send_seconds
+
+# Statuses worth retrying: throttling and server-side failures
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class RateLimiter:
+    """
+    Async token bucket shared by every sender in the process.
+
+    Tokens refill at ``rate_per_second`` up to ``burst``; ``acquire`` waits
+    until a token is available, so bursts above the rate are smoothed out
+    instead of being rejected by the API.
+    """
+
+    def __init__(self, rate_per_second: float, burst: int):
+        self.rate = rate_per_second
+        self.burst = burst
+
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._waits = LatencyStats()
+
+    async def acquire(self):
+        """Waits for and consumes one token."""
+        start = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated_at) * self.rate
+                )
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+        self._waits.observe(time.monotonic() - start)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the configured rate and the time spent waiting for tokens."""
+        return {
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "wait": self._waits.snapshot(),
+        }
+
+
+class WhatsAppSender:
+    """
+    Sends replies through the WhatsApp Cloud API over one keep-alive client.
+
+    The ``httpx.AsyncClient`` is created by ``start`` (or on first use) and
+    shared by every send, so connections to the Graph API are pooled and, with
+    ``http2``, multiplexed. Each send waits for the rate limiter, and 429, 5xx
+    and transport errors are retried with exponential backoff and jitter,
+    honouring ``Retry-After`` when Meta sends it.
+    """
+
+    def __init__(
+        self,
+        graph_url: str,
+        api_version: str,
+        phone_number_id: str,
+        access_token: str,
+        rate_limiter: RateLimiter,
+        http2: bool = True,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry_seconds: float = 60.0,
+        connect_timeout_seconds: float = 5.0,
+        read_timeout_seconds: float = 15.0,
+        max_retries: int = 3,
+        backoff_base_seconds: float = 0.5,
+        backoff_max_seconds: float = 10.0,
+    ):
+        self.url = f"{graph_url}/{api_version}/{phone_number_id}/messages"
+        self.headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json",
+        }
+        self.rate_limiter = rate_limiter
+        self.http2 = http2
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry_seconds,
+        )
+        self.timeout = httpx.Timeout(
+            read_timeout_seconds,
+            connect=connect_timeout_seconds,
+            pool=read_timeout_seconds,
+        )
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base_seconds
+        self.backoff_max = backoff_max_seconds
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._counters = {
+            "sent": 0,
+            "failed": 0,
+            "retried": 0,
+            "throttled": 0,
+        }
+
+    async def start(self):
+        """Creates the shared HTTP client."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=self.limits,
+                timeout=self.timeout,
+                headers=self.headers,
+            )
+            logging.info(f"WhatsApp client ready (http2={self.http2})")
+
+    async def stop(self):
+        """Closes the shared HTTP client and its connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def send_text(self, recipient_id: str, message_text: str) -> bool:
+        """
+        Sends a text message, retrying throttled and failed attempts.
+
+        Args:
+            recipient_id (str): The recipient's phone number.
+            message_text (str): The message content to be sent.
+
+        Returns:
+            bool: True if the message was sent successfully, False otherwise.
+        """
+        await self.start()
+        message_payload = {
+            "messaging_product": "whatsapp",
+            "to": recipient_id,
+            "type": "text",
+            "text": {"body": message_text},
+        }
+
+        with whatsapp_send_seconds.time() as labels:
+            for attempt in range(self.max_retries + 1):
+                await self.rate_limiter.acquire()
+                retry_after = None
+                try:
+                    response = await self._client.post(self.url, json=message_payload)
+                except httpx.TransportError as http_error:
+                    logging.warning(
+                        f"WhatsApp send to {recipient_id} failed: {http_error}"
+                    )
+                except Exception as error:
+                    # E.g. an invalid URL, an unserializable payload or a client
+                    # closed during shutdown: retrying would fail the same way
+                    logging.error(
+                        f"WhatsApp send to {recipient_id} failed: {error!r}",
+                        exc_info=True,
+                    )
+                    break
+                else:
+                    if response.status_code == 200:
+                        self._counters["sent"] += 1
+                        return True
+
+                    logging.warning(
+                        f"WhatsApp send to {recipient_id} failed: "
+                        f"{response.status_code}, {response.text}"
+                    )
+                    if response.status_code not in RETRYABLE_STATUS_CODES:
+                        break
+                    if response.status_code == 429:
+                        self._counters["throttled"] += 1
+                        retry_after = _retry_after_seconds(response)
+
+                if attempt < self.max_retries:
+                    self._counters["retried"] += 1
+                    await asyncio.sleep(self._backoff(attempt, retry_after))
+
+            labels["outcome"] = "error"
+            self._counters["failed"] += 1
+            logging.error(f"Giving up sending the reply to {recipient_id}")
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        """Return send counters and the rate limiter's waiting time."""
+        return {
+            **self._counters,
+            "rate_limiter": self.rate_limiter.stats(),
+        }
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        if retry_after is not None:
+            return min(self.backoff_max, retry_after)
+        delay = min(self.backoff_max, self.backoff_base * 2**attempt)
+        return delay * random.uniform(0.5, 1.0)
+
+
+def _retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
+
+
+_whatsapp_sender = None
+
+
+def get_whatsapp_sender() -> WhatsAppSender:
+    """Return the process-wide WhatsApp sender."""
+    global _whatsapp_sender
+
+    if _whatsapp_sender is None:
+        whatsapp_config = settings.whatsapp
+        _whatsapp_sender = WhatsAppSender(
+            graph_url=whatsapp_config.graph_url,
+            api_version=whatsapp_config.api_version,
+            phone_number_id=whatsapp_config.phone_number_id,
+            access_token=whatsapp_config.access_token,
+            rate_limiter=RateLimiter(
+                whatsapp_config.rate_limit_per_second, whatsapp_config.rate_limit_burst
+            ),
+            http2=whatsapp_config.http2,
+            max_connections=whatsapp_config.max_connections,
+            max_keepalive_connections=whatsapp_config.max_keepalive_connections,
+            keepalive_expiry_seconds=whatsapp_config.keepalive_expiry_seconds,
+            connect_timeout_seconds=whatsapp_config.connect_timeout_seconds,
+            read_timeout_seconds=whatsapp_config.read_timeout_seconds,
+            max_retries=whatsapp_config.max_retries,
+            backoff_base_seconds=whatsapp_config.backoff_base_seconds,
+            backoff_max_seconds=whatsapp_config.backoff_max_seconds,
+        )
+    return _whatsapp_sender
@@ -0,0 +1,91 @@
+import asyncio
+import importlib
+
+import pytest
+
+from src.schemas import (
+    RoutedMessageRequest,
+    UpdateUserDataIntent,
+    UserProfileUpdateRequest,
+)
+
+# src.core re-exports the llm_router function under the module's name
+router = importlib.import_module("src.core.llm_router")
+
+
+@pytest.fixture
+def routed_to_profile_update(monkeypatch):
+    """Routes every message to update_users_data without a database or LLM."""
+
+    async def load(user_message, sender_id):
+        return object()
+
+    async def no_fast_reply(*args, **kwargs):
+        return None
+
+    async def not_decided_locally(context):
+        return None
+
+    async def route_and_extract(context):
+        return RoutedMessageRequest(
+            intent=UpdateUserDataIntent(
+                request_type="update_users_data",
+                field_type="city",
+                field_value="Lisbon",
+            ),
+            confidence_score=0.95,
+            description="The user moved to Lisbon.",
+        )
+
+    monkeypatch.setattr(router.RequestContext, "load", load)
+    monkeypatch.setattr(router, "tracking_fast_path", no_fast_reply)
+    monkeypatch.setattr(router, "classify_intent_locally", not_decided_locally)
+    monkeypatch.setattr(router, "route_and_extract_message_request", route_and_extract)
+    monkeypatch.setattr(router.settings.routing, "mode", "combined")
+
+
+def test_profile_update_replies_with_a_confirmation(
+    monkeypatch, routed_to_profile_update
+):
+    async def update_user_profile(context, extracted=None):
+        return extracted
+
+    monkeypatch.setattr(router, "update_user_profile", update_user_profile)
+
+    reply = asyncio.run(
+        router.llm_router("I moved to Lisbon", sender_id="351900000000")
+    )
+
+    assert reply == "Your city has been updated to Lisbon."
+
+
+def test_failed_profile_update_replies_with_the_apology(
+    monkeypatch, routed_to_profile_update
+):
+    async def update_user_profile(context, extracted=None):
+        assert isinstance(extracted, UserProfileUpdateRequest)
+        return None
+
+    monkeypatch.setattr(router, "update_user_profile", update_user_profile)
+
+    reply = asyncio.run(
+        router.llm_router("I moved to Lisbon", sender_id="351900000000")
+    )
+
+    assert reply == router.ERROR_REPLY
+
+
+def test_tracking_fast_path_does_not_load_history(monkeypatch):
+    async def load(user_message, sender_id):
+        raise AssertionError("history loaded for a fast path reply")
+
+    async def fast_reply(context):
+        assert context.interactions == []
+        return f"Status of {context.user_message}"
+
+    monkeypatch.setattr(router.RequestContext, "load", load)
+    monkeypatch.setattr(router, "tracking_fast_path", fast_reply)
+
+    reply = asyncio.run(router.llm_router("AB123456789BR", sender_id="351900000000"))
+
+    assert reply == "Status of AB123456789BR"
@@ -0,0 +1,195 @@
+import os
+
+import pytest
+from sqlalchemy import text
+
+from src.utils import db
+from src.utils import tracking_cache
+from src.utils.tracking_cache import TrackingCache, install_tracking_notify_trigger
+
+
+class FakeClock:
+    """Stands in for the ``time`` module, so entries expire without sleeping."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class RecordingLoader:
+    """Loader returning a row for every code in ``rows``, recording each call."""
+
+    def __init__(self, rows=None):
+        self.rows = rows if rows is not None else {}
+        self.calls = []
+
+    def __call__(self, tracking_codes):
+        self.calls.append(list(tracking_codes))
+        return {code: self.rows[code] for code in tracking_codes if code in self.rows}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(tracking_cache, "time", clock)
+    return clock
+
+
+def test_known_code_is_cached_for_the_ttl(clock):
+    loader = RecordingLoader({"AB123": {"status": "shipped"}})
+    cache = TrackingCache(ttl_seconds=60, negative_ttl_seconds=10, loader=loader)
+
+    assert cache.get("AB123") == {"status": "shipped"}
+    clock.now += 60
+    assert cache.get("AB123") == {"status": "shipped"}
+    assert len(loader.calls) == 1
+
+    clock.now += 1
+    cache.get("AB123")
+    assert len(loader.calls) == 2
+
+
+def test_unknown_code_is_cached_for_the_negative_ttl(clock):
+    loader = RecordingLoader()
+    cache = TrackingCache(ttl_seconds=60, negative_ttl_seconds=10, loader=loader)
+
+    assert cache.get("ZZ999") is None
+    clock.now += 10
+    assert cache.get("ZZ999") is None
+    assert len(loader.calls) == 1
+    assert cache.stats()["negative_hits"] == 1
+
+    clock.now += 1
+    cache.get("ZZ999")
+    assert len(loader.calls) == 2
+
+
+def test_least_recently_used_code_is_evicted(clock):
+    loader = RecordingLoader({"A1": {}, "B2": {}, "C3": {}})
+    cache = TrackingCache(max_entries=2, loader=loader)
+
+    cache.get("A1")
+    cache.get("B2")
+    cache.get("A1")  # B2 becomes the least recently used
+    cache.get("C3")
+    assert cache.stats()["evictions"] == 1
+
+    loader.calls.clear()
+    cache.get_many(["A1", "C3"])
+    assert loader.calls == []
+    cache.get("B2")
+    assert loader.calls == [["B2"]]
+
+
+def test_codes_are_upper_cased(clock):
+    loader = RecordingLoader({"AB123": {"status": "shipped"}})
+    cache = TrackingCache(loader=loader)
+
+    assert cache.get("ab123") == {"status": "shipped"}
+    assert cache.get("Ab123") == {"status": "shipped"}
+    assert loader.calls == [["AB123"]]
+
+
+def test_misses_are_loaded_with_one_bulk_call(clock):
+    loader = RecordingLoader({"A1": {"status": "a"}, "B2": {"status": "b"}})
+    cache = TrackingCache(loader=loader)
+    cache.get("A1")
+    loader.calls.clear()
+
+    found = cache.get_many(["a1", "B2", "b2", "C3"])
+
+    assert loader.calls == [["B2", "C3"]]
+    assert found == {"A1": {"status": "a"}, "B2": {"status": "b"}, "C3": None}
+
+
+def test_invalidate_drops_one_code_or_everything(clock):
+    loader = RecordingLoader({"A1": {}, "B2": {}})
+    cache = TrackingCache(loader=loader)
+    cache.get_many(["A1", "B2"])
+
+    cache.invalidate("a1")
+    cache.get_many(["A1", "B2"])
+    assert loader.calls[-1] == ["A1"]
+
+    cache.invalidate()
+    cache.get_many(["A1", "B2"])
+    assert loader.calls[-1] == ["A1", "B2"]
+
+
+def test_rows_loaded_during_an_invalidation_are_not_cached(clock):
+    cache = None
+
+    def loader(tracking_codes):
+        # The change is announced while the query is running
+        cache.invalidate(tracking_codes[0])
+        return {code: {"status": "before the change"} for code in tracking_codes}
+
+    cache = TrackingCache(loader=loader)
+
+    assert cache.get("A1") == {"status": "before the change"}
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["discarded_loads"] == 1
+
+
+@pytest.fixture
+def test_database(monkeypatch):
+    """
+    A disposable Postgres server from ``TEST_DATABASE_URL``, given like
+    ``DATABASE_URL`` and holding a ``postal_service`` database, never the app's
+    configured one; the tests are skipped without it.
+    """
+    database_url = os.environ.get("TEST_DATABASE_URL")
+    if not database_url:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    # settings.database_url is formatted from DATABASE_URL when read
+    monkeypatch.setenv("DATABASE_URL", database_url)
+    monkeypatch.setattr(db, "_engine", None)
+    monkeypatch.setattr(db, "_session_factory", None)
+    engine = db.get_engine()
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                """
+                CREATE TABLE IF NOT EXISTS package_tracking (
+                    tracking_code VARCHAR(50) PRIMARY KEY,
+                    status VARCHAR(50) NOT NULL,
+                    last_update TIMESTAMP NOT NULL,
+                    location TEXT NOT NULL
+                )
+                """
+            )
+        )
+
+    yield engine
+
+    with engine.begin() as connection:
+        connection.execute(
+            text("DROP TRIGGER IF EXISTS tracking_change_notify ON package_tracking")
+        )
+        connection.execute(text("DROP FUNCTION IF EXISTS notify_tracking_change()"))
+    engine.dispose()
+
+
+def test_install_tracking_notify_trigger_persists_trigger(test_database):
+    install_tracking_notify_trigger("tracking_changes_test")
+
+    # A new connection only sees the trigger if the DDL was committed
+    with test_database.connect() as connection:
+        trigger = connection.execute(
+            text(
+                """
+                SELECT tgname FROM pg_trigger
+                WHERE tgrelid = 'package_tracking'::regclass
+                  AND tgname = 'tracking_change_notify'
+                """
+            )
+        ).scalar()
+        function = connection.execute(
+            text("SELECT prosrc FROM pg_proc WHERE proname = 'notify_tracking_change'")
+        ).scalar()
+
+    assert trigger == "tracking_change_notify"
+    assert "tracking_changes_test" in function